@@ -1,14 +1,31 @@
 # scheduler/backend/app.py
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS # Used to handle Cross-Origin Resource Sharing for frontend communication
 import json
 import os
-import PyPDF2
-import re
+import queue
+import threading
+import time
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv # To load environment variables from .env
-from groq import Groq # Uncommented: Import Groq client
+
+from chunking import chunk_token_budget, split_into_chunks
+from config import Config
+from corpus_loader import corpus_version
+from corpus_watcher import CorpusWatcher
+from corpus_store import CorpusStore, diff_manifest, file_manifest, open_corpus_store, write_corpus_store
+from extraction_cache import ExtractionCache
+from ingest import ingest_documents
+from jobs import JobQueue, QueueFullError
+from llm_client import FakeLLMClient, GroqLLMClient
+from metrics import CACHE_LOOKUPS, FALLBACKS, LLM_ERRORS, LLM_TOKENS_SENT, REQUEST_SECONDS, SamplingProfiler, render_metrics, span
+from rate_limit import estimate_tokens
+from response_cache import ResponseCache
+from scheduler import build_schedule
+from subjects import SubjectRegistry, discover_subjects, load_curriculum, subject_key
+from topic_cache import TopicScoreCache, content_hash, fingerprint
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,153 +35,208 @@ app = Flask(__name__)
 CORS(app) # Enable CORS for all routes
 
 # Define paths to your data directories relative to this app.py file
+# Each subject has a `data/<subject>_curriculum.json` file and `data/<subject>/pyqs|textbooks`
+# directories (Biology may keep using `data/pyqs` and `data/textbooks`), see subjects.py.
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
-PYQS_DIR = os.path.join(DATA_DIR, 'pyqs')
-TEXTBOOKS_DIR = os.path.join(DATA_DIR, 'textbooks')
-CURRICULUM_PATH = os.path.join(DATA_DIR, 'biology_curriculum.json')
-
-# --- Load the Biology Curriculum Topics ---
-BIOLOGY_CURRICULUM = {}
-FLATTENED_TOPICS = []
-try:
-    with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        BIOLOGY_CURRICULUM = data.get('biology', {})
-    print(f"Successfully loaded biology curriculum from: {CURRICULUM_PATH}")
-    # Flatten all subtopics into a single list for easier keyword matching/Grok AI prompting
-    FLATTENED_TOPICS = [subtopic for chapter_topics in BIOLOGY_CURRICULUM.values() for subtopic in chapter_topics]
-    print(f"Total {len(FLATTENED_TOPICS)} subtopics loaded for analysis.")
-except FileNotFoundError:
-    print(f"Error: {CURRICULUM_PATH} not found. Please ensure it's in the 'backend/data/' directory.")
-except json.JSONDecodeError:
-    print(f"Error: Could not decode JSON from {CURRICULUM_PATH}. Check file format.")
-
-# --- Initialize Groq Client ---
-GROQ_API_KEY = os.getenv("GROQ_API_KEY") # Uncommented: Get API key from environment
-if not GROQ_API_KEY:
-    print("Error: GROQ_API_KEY not found in environment variables. Please set it in .env file.")
-    # You might want to raise an error or exit if the key is essential for your app
-    raise ValueError("GROQ_API_KEY is not set. Cannot initialize Groq client.") # Uncommented: Raise error if key missing
-
-groq_client = Groq(api_key=GROQ_API_KEY) # Uncommented: Initialize Groq client
-
-
-# --- Helper Function to Extract Text from PDF (from utils.py, but keeping here for single file ease) ---
-def extract_text_from_pdf(pdf_path):
-    """
-    Extracts text content from a PDF file.
-    """
-    text = ""
-    try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                text += reader.pages[page_num].extract_text() or ''
-        return text
-    except PyPDF2.errors.PdfReadError:
-        print(f"Warning: Could not read PDF file {pdf_path}. It might be corrupted or encrypted.")
-        return ""
-    except Exception as e:
-        print(f"Error extracting text from {pdf_path}: {e}")
-        return ""
+
+# Available topic scoring backends for analyze_and_generate_schedule()
+TOPIC_SCORING_MODES = ('llm', 'keyword', 'tfidf')
+
+# Available schedule builders: Grok AI, or the deterministic local optimizer in scheduler.py
+SCHEDULE_MODES = ('llm', 'local')
+
+# --- Initialize the LLM Client ---
+# Config.LLM_BACKEND selects Grok AI through Groq ('groq') or a local fake with canned responses
+# ('fake', for benchmarks and offline development). See llm_client.py for the interface.
+if Config.LLM_BACKEND == 'fake':
+    # The fake answers with topics of the curricula present at startup (those offered in each prompt)
+    llm_client = FakeLLMClient(Config.FAKE_LLM_LATENCY_MS / 1000, [
+        topic for name, path in discover_subjects(DATA_DIR).items() for topics in load_curriculum(path, name).values() for topic in topics
+    ])
+else:
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY") # Uncommented: Get API key from environment
+    if GROQ_API_KEY:
+        # The client's shared limiter keeps concurrent calls within Groq's requests/tokens-per-minute quotas
+        llm_client = GroqLLMClient(
+            GROQ_API_KEY,
+            Config.GROQ_MODEL, # Choose an appropriate Groq model
+            Config.GROQ_REQUESTS_PER_MINUTE,
+            Config.GROQ_TOKENS_PER_MINUTE,
+            Config.GROQ_COMPLETION_TOKEN_ESTIMATE,
+            Config.GROQ_MAX_RETRIES,
+        )
+    else:
+        # Serving from topic-weight snapshots (see build_snapshot.py) with the local scheduler needs no key
+        print("Warning: GROQ_API_KEY not found in environment variables. Grok AI calls are disabled; "
+              "schedules use topic-weight snapshots, offline scoring and the local scheduler.")
+        llm_client = None
+
 
 # --- Function to Read All PYQs and Textbook Content ---
-def get_all_document_texts():
+def get_all_document_texts(subject, progress=None, use_cache=True, page_lengths=None, paths=None):
     """
-    Reads all text content from PYQ and textbook files.
-    Supports .txt and .pdf files.
+    Reads all text content from a subject's PYQ and textbook files.
+    Supports .txt and .pdf files; PDFs are extracted in parallel (see ingest.py)
+    and served from the on-disk extraction cache when unchanged.
+    `progress` is the CorpusLoader callback used to report how many files have been read.
+    `page_lengths`, if given, is filled with the length of each document's pages.
+    `paths`, if given, restricts reading to those files (used for incremental updates).
     Returns a dictionary mapping file paths to their content.
     """
+    # One cache directory per subject: prune() drops whatever its own index doesn't reference, so
+    # subjects loading at the same time must not share one
+    cache = ExtractionCache(os.path.join(Config.EXTRACTION_CACHE_DIR, subject.name)) if use_cache else None
     all_texts = {}
+    pyq_files, textbook_files = subject.document_files()
+    if paths is not None:
+        pyq_files = [path for path in pyq_files if path in paths]
+        textbook_files = [path for path in textbook_files if path in paths]
+    file_done = None
+    if progress:
+        progress(total=len(pyq_files) + len(textbook_files))
+        file_done = lambda file_path: progress(file_path=file_path)
 
-    print("\nReading PYQ files...")
-    for filename in os.listdir(PYQS_DIR):
-        file_path = os.path.join(PYQS_DIR, filename)
-        if os.path.isfile(file_path): # Ensure it's a file, not a directory
-            if filename.endswith('.txt'):
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        all_texts[file_path] = f.read()
-                    print(f"  - Read: {filename} (TXT)")
-                except Exception as e:
-                    print(f"  - Error reading {filename} (TXT): {e}")
-            elif filename.endswith('.pdf'):
-                pdf_text = extract_text_from_pdf(file_path)
-                if pdf_text:
-                    all_texts[file_path] = pdf_text
-                    print(f"  - Read: {filename} (PDF)")
-                else:
-                    print(f"  - Skipped: {filename} (PDF - no text extracted or error)")
-            else:
-                print(f"  - Skipped: {filename} (Unsupported format)")
-
-    print("\nReading Textbook files...")
-    for filename in os.listdir(TEXTBOOKS_DIR):
-        file_path = os.path.join(TEXTBOOKS_DIR, filename)
-        if os.path.isfile(file_path): # Ensure it's a file, not a directory
-            if filename.endswith('.txt'):
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        all_texts[file_path] = f.read()
-                    print(f"  - Read: {filename} (TXT)")
-                except Exception as e:
-                    print(f"  - Error reading {filename} (TXT): {e}")
-            elif filename.endswith('.pdf'):
-                pdf_text = extract_text_from_pdf(file_path)
-                if pdf_text:
-                    all_texts[file_path] = pdf_text
-                    print(f"  - Read: {filename} (PDF)")
-                else:
-                    print(f"  - Skipped: {filename} (PDF - no text extracted or error)")
-            else:
-                print(f"  - Skipped: {filename} (Unsupported format)")
+    print(f"\nReading {subject.display_name} PYQ files...")
+    all_texts.update(ingest_documents(pyq_files, cache, Config.INGEST_WORKERS, progress=file_done, page_lengths=page_lengths))
 
-    return all_texts # Return dictionary of {filepath: content}
+    print(f"\nReading {subject.display_name} Textbook files...")
+    all_texts.update(ingest_documents(textbook_files, cache, Config.INGEST_WORKERS, progress=file_done, page_lengths=page_lengths))
 
+    if cache:
+        cache.prune()
+        cache.save()
 
-# --- Global variable to store all combined text, loaded once at startup ---
-# This will be a dictionary: {filepath: content_string}
-ALL_DOCUMENT_CONTENTS = get_all_document_texts()
+    return all_texts # Return dictionary of {filepath: content}
 
 
-# --- Core ML Logic: Analyze PYQs and Generate Schedule ---
-def analyze_and_generate_schedule(subject, days, target_score, curriculum_topics_list, document_contents):
+def load_corpus(subject, progress=None):
     """
-    This function will contain your Grok AI powered logic to:
-    1. Process document contents (from PYQs and textbooks).
-    2. Identify important topics based on frequency/weightage using `curriculum_topics_list`.
-    3. Generate a comprehensive study schedule.
+    Brings a subject's memory-mapped corpus store up to date with its document directories,
+    then builds its updated TF-IDF index (only new or changed documents are re-counted) with
+    precomputed topic weights and swaps it in.
+
+    The directories are compared with the file manifest (path, size, mtime, hash) of the
+    current store, or of the store left on disk by an earlier run. Only added or changed
+    files are read; unchanged documents are copied over from the old store and deleted
+    ones are dropped. If nothing changed, the existing store is reused as is.
+    Returns the CorpusStore; extracted strings are released once it is written, so each
+    worker only keeps the shared mapping.
     """
-    if not FLATTENED_TOPICS:
-        print("Warning: No biology topics loaded from curriculum. Cannot generate specific schedule.")
-        return [{"day": d, "topics": [f"General Study Day {d} - No specific topics (Curriculum not loaded)"]} for d in range(1, days + 1)]
+    base = subject.corpus_loader.documents
+    if not isinstance(base, CorpusStore):
+        base = open_corpus_store(subject.store_dir)
+    pyq_files, textbook_files = subject.document_files(verbose=False)
+    file_paths = pyq_files + textbook_files
+    previous_files = base.files if base else {}
+    files = file_manifest(file_paths, previous_files)
+    added, changed, removed = diff_manifest(previous_files, files)
+
+    if base is not None and not (added or changed or removed):
+        print(f"{subject.display_name} corpus unchanged ({len(base)} documents).")
+        if files != previous_files:
+            # Only sizes or mtimes changed (e.g. files touched): record them so they are not re-hashed
+            base.update_files(files)
+        if progress:
+            progress(total=len(file_paths))
+            for file_path in file_paths:
+                progress(file_path=file_path)
+        store = base
+    else:
+        if base is not None:
+            print(f"{subject.display_name} corpus changed: {len(added)} added, {len(changed)} changed, {len(removed)} removed.")
+        page_lengths = {}
+        stale = set(added + changed) if base is not None else None
+        documents = get_all_document_texts(subject, progress, page_lengths=page_lengths, paths=stale)
+        if base is not None:
+            # Keep the directory order; unchanged documents (None) are copied from the old store
+            documents = {path: documents[path] if path in stale else None for path in files
+                         if path in documents or (path not in stale and path in base)}
+        write_corpus_store(subject.store_dir, documents, page_lengths, files, base)
+        del documents
+        store = CorpusStore(subject.store_dir)
+    # Build the new index (and its weights) aside and swap it in whole; requests still holding
+    # the previous corpus get weights for exactly that corpus (see TfidfTopicIndex.topic_weights)
+    tfidf_index = subject.tfidf_index.updated(store)
+    tfidf_index.topic_weights()
+    subject.tfidf_index = tfidf_index
+    if subject.snapshot is not None and subject.snapshot.metadata.get('corpusVersion') != corpus_version(store):
+        print(f"Warning: The {subject.display_name} topic-weight snapshot was built from an older corpus. Rebuild it with build_snapshot.py.")
+    return store
+
+
+# --- Subject registry ---
+# Subjects are discovered from the curriculum files in DATA_DIR and loaded on first use; each one
+# reads its documents on a background loader (subject.corpus_loader), whose `documents` is a
+# read-only {filepath: content_string} mapping backed by the corpus store. The server can
+# therefore bind its port and answer health checks while PDFs are still being read.
+subject_registry = SubjectRegistry(DATA_DIR, load_corpus, Config.TFIDF_INDEX_DIR, Config.CORPUS_STORE_DIR,
+                                   Config.SUBJECT_CACHE_MAX_LOADED, Config.SUBJECT_CACHE_MAX_BYTES, Config.SNAPSHOT_DIR,
+                                   lambda: snapshot_expectations())
+
+# Picks up added, edited or deleted PYQ/textbook files without a restart (polling starts with the first request)
+corpus_watcher = CorpusWatcher(subject_registry, Config.CORPUS_WATCH_INTERVAL_SECONDS)
+
+
+@app.before_request
+def start_corpus_watcher():
+    corpus_watcher.ensure_started()
+
+
+# --- Request Metrics and Optional Profiling ---
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    # With PROFILE_REQUESTS enabled, `?profile=1` or an `X-Profile: 1` header profiles this one request
+    if Config.PROFILE_REQUESTS and (request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1'):
+        g.profiler = SamplingProfiler(Config.PROFILE_INTERVAL_MS / 1000).start()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """
+    Records the request's latency by route (the URL rule, so job ids don't each get a series).
+    For the streaming endpoint this measures the time until the stream starts.
+    A profiled request's samples are written to PROFILE_DIR and named in the X-Profile header.
+    """
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method, status=response.status_code)
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{endpoint.strip('/').replace('/', '_') or 'root'}-{os.getpid()}.txt"
+        with open(os.path.join(Config.PROFILE_DIR, filename), 'w', encoding='utf-8') as f:
+            f.write(profiler.stop())
+        print(f"Profile of {request.method} {request.path} written to {filename} ({sum(profiler.samples.values())} samples).")
+        response.headers['X-Profile'] = filename
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint: pipeline step timings, cache hit/miss counts, fallbacks,
+    LLM errors and prompt tokens, and per-endpoint latency histograms (see metrics.py).
+    Metrics are per process; with several web workers, scrape each one.
+    """
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
 
-    # --- Step 1: Topic Extraction and Weightage Calculation using Grok AI ---
-    print("\nStarting topic analysis using Grok AI...")
-    topic_weights = Counter() # Using Counter to store topic frequencies/importance scores
 
-    # Iterate through each document (PYQ/Textbook Chapter)
-    for doc_path, doc_content in document_contents.items():
-        print(f"Analyzing document: {os.path.basename(doc_path)}")
-        
-        # Grok models have context windows (e.g., 8192 tokens).
-        # It's crucial to ensure `doc_content` fits within the model's context.
-        # For very large documents, you might need to chunk `doc_content` and send multiple prompts.
-        # For demonstration, we'll use a slice, but in production, consider proper tokenization/chunking.
-        max_prompt_length = 8000 # A conservative estimate for prompt + completion tokens
-        content_to_send = doc_content[:max_prompt_length] # Take first N characters
-
-        # --- Grok AI Prompt for Topic Extraction and Scoring ---
-        prompt_for_topics = f"""
-        Analyze the following text from a Biology exam paper or textbook.
-        Identify which of the following 12th-grade Biology topics are discussed in this text.
+# --- Grok AI Prompt for Topic Extraction and Scoring ---
+# Grok models have context windows (e.g., 8192 tokens), so each document is split into chunks
+# that fit alongside the prompt and the completion (see chunking.py); every chunk is scored
+# separately and the chunk scores are combined back into per-document weights.
+TOPIC_PROMPT_TEMPLATE = """
+        Analyze the following text from a {subject} exam paper or textbook.
+        Identify which of the following 12th-grade {subject} topics are discussed in this text.
         For each identified topic, assign a relevance score from 1 (low) to 5 (high) based on how prominently or frequently it appears, or how central it is to the text.
         
-        List of 12th-grade Biology topics: {', '.join(curriculum_topics_list)}
+        List of 12th-grade {subject} topics: {topics}
 
         Text:
         ---
-        {content_to_send}
+        {content}
         ---
 
         Provide the output as a JSON array of objects, where each object has "topic" (string) and "score" (integer).
@@ -175,55 +247,214 @@ def analyze_and_generate_schedule(subject, days, target_score, curriculum_topics
         ]
         Only provide the JSON array in your response.
         """
-        
-        # --- Make a call to Grok AI ---
-        try:
-            chat_completion = groq_client.chat.completions.create( # Uncommented: Grok AI call
-                messages=[
-                    {"role": "user", "content": prompt_for_topics}
-                ],
-                model="llama3-8b-8192", # Choose an appropriate Groq model
-                response_format={"type": "json_object"} # Request JSON output
-            )
-            grok_response_text = chat_completion.choices[0].message.content
-            try:
-                grok_topics_data = json.loads(grok_response_text)
-                if isinstance(grok_topics_data, list): # Ensure it's a list
-                    for item in grok_topics_data:
-                        topic = item.get("topic")
-                        score = item.get("score", 0)
-                        if topic and score is not None and isinstance(score, (int, float)):
-                            topic_weights[topic] += int(score) # Aggregate scores across documents
-                            print(f"  - Grok identified '{topic}' with score {int(score)}")
-                else:
-                    print(f"  - Grok AI response was not a JSON list: {grok_response_text[:200]}...")
-            except json.JSONDecodeError:
-                print(f"  - Grok AI response was not valid JSON: {grok_response_text[:200]}...")
-            except Exception as e:
-                print(f"  - Error processing Grok AI response for {os.path.basename(doc_path)}: {e}")
-        except Exception as e:
-            print(f"  - Error calling Grok AI for {os.path.basename(doc_path)}: {e}")
-            # Fallback to simple keyword matching if Grok AI call fails (optional)
-            for topic in curriculum_topics_list:
-                if re.search(r'\b' + re.escape(topic.lower()) + r'\b', doc_content.lower()):
-                    topic_weights[topic] += 1 # Add a base weight for simple match
 
+# Changing the prompt invalidates previously cached topic scores
+TOPIC_PROMPT_VERSION = fingerprint(TOPIC_PROMPT_TEMPLATE)
 
-    if not topic_weights:
-        print("No curriculum topics found in documents by Grok AI analysis. Generating generic schedule.")
-        return [{"day": d, "topics": [f"General Study Day {d} - No specific topics found"]} for d in range(1, days + 1)]
+# Persistent cache of per-chunk topic scores, so unchanged text is never re-sent to Grok AI
+topic_score_cache = TopicScoreCache(Config.TOPIC_CACHE_PATH, Config.TOPIC_CACHE_MAX_ENTRIES, Config.TOPIC_CACHE_TTL_SECONDS)
 
-    # Sort topics by their aggregated weightage in descending order
-    sorted_weighted_topics = sorted(topic_weights.items(), key=lambda item: item[1], reverse=True)
-    print("\nTopics by aggregated weightage (most important first):")
-    for topic, weight in sorted_weighted_topics:
-        print(f"  - {topic}: {weight}")
 
-    # --- Step 2: Schedule Generation Logic (Further Grok AI integration) ---
-    print(f"\nGenerating schedule for {days} days with target score {target_score}% using weighted topics...")
+def llm_model():
+    """
+    Returns the identity of the current LLM backend and model (e.g. 'llama3-8b-8192' or 'fake'),
+    used in cache keys so results of one backend are never served for another.
+    """
+    return llm_client.model if llm_client is not None else 'none'
+
+
+def snapshot_expectations():
+    """
+    Returns the prompt version (and, with an LLM backend configured, the model) that topic-weight
+    snapshots are expected to have been built with; others are served with a warning.
+    """
+    expected = {'promptVersion': TOPIC_PROMPT_VERSION}
+    if llm_client is not None:
+        expected['model'] = llm_model()
+    return expected
+
+
+def call_llm(prompt, purpose):
+    """
+    Sends `prompt` to the configured LLM backend, recording the call's latency, the estimated
+    prompt tokens and failures under `purpose` ('topics' or 'schedule'). Raises on failure.
+    """
+    if llm_client is None:
+        raise RuntimeError("No LLM backend configured (GROQ_API_KEY is not set).")
+    LLM_TOKENS_SENT.inc(estimate_tokens(prompt), purpose=purpose)
+    try:
+        with span(f'llm_{purpose}'):
+            return llm_client.complete(prompt)
+    except Exception:
+        LLM_ERRORS.inc(purpose=purpose, reason='call_failed')
+        raise
+
+
+def score_chunk_topics(label, chunk_text, curriculum_topics_list, curriculum_version=None, subject_name='Biology'):
+    """
+    Asks Grok AI which curriculum topics a chunk of text covers, and how prominently.
+    Results are memoized in `topic_score_cache` by text hash, curriculum version,
+    prompt version and model.
+    Returns a list of (topic, score) pairs, or None if the Grok AI call failed.
+    """
+    curriculum_version = curriculum_version or fingerprint(curriculum_topics_list)
+    cache_key = (content_hash(chunk_text), curriculum_version, TOPIC_PROMPT_VERSION, llm_model())
+    cached_scores = topic_score_cache.get(*cache_key)
+    CACHE_LOOKUPS.inc(cache='topic_scores', result='miss' if cached_scores is None else 'hit')
+    if cached_scores is not None:
+        print(f"  - Using cached topic scores for {label} ({len(cached_scores)} topics)")
+        return cached_scores
+
+    prompt_for_topics = TOPIC_PROMPT_TEMPLATE.format(subject=subject_name, topics=', '.join(curriculum_topics_list), content=chunk_text)
+
+    # --- Make a call to Grok AI ---
+    try:
+        grok_response_text = call_llm(prompt_for_topics, 'topics') # Uncommented: Grok AI call
+    except Exception as e:
+        print(f"  - Error calling Grok AI for {label}: {e}")
+        return None
 
+    scores = []
+    try:
+        with span('parse_topics'):
+            grok_topics_data = json.loads(grok_response_text)
+            if isinstance(grok_topics_data, list): # Ensure it's a list
+                for item in grok_topics_data:
+                    topic = item.get("topic")
+                    score = item.get("score", 0)
+                    if topic and score is not None and isinstance(score, (int, float)):
+                        scores.append((topic, int(score)))
+                        print(f"  - Grok identified '{topic}' with score {int(score)} in {label}")
+                topic_score_cache.put(*cache_key, scores) # Only well-formed responses are cached
+            else:
+                LLM_ERRORS.inc(purpose='topics', reason='unexpected_format')
+                print(f"  - Grok AI response was not a JSON list: {grok_response_text[:200]}...")
+    except json.JSONDecodeError:
+        LLM_ERRORS.inc(purpose='topics', reason='invalid_json')
+        print(f"  - Grok AI response was not valid JSON: {grok_response_text[:200]}...")
+    except Exception as e:
+        LLM_ERRORS.inc(purpose='topics', reason='unexpected_format')
+        print(f"  - Error processing Grok AI response for {label}: {e}")
+    return scores
+
+
+def combine_chunk_scores(chunk_scores, chunk_texts, keyword_scorer, fallbacks=None):
+    """
+    Combines the scores of one document's chunks into per-document topic weights.
+    A topic's document score is its highest chunk score, so a long textbook counts no more
+    than a short paper for a topic it covers in one chapter.
+    Chunks whose Grok AI call failed (None) fall back to offline scoring with `keyword_scorer`;
+    each fallback is recorded in `fallbacks`, if given.
+    Returns a {topic: score} dictionary.
+    """
+    doc_scores = {}
+    for scores, chunk_text in zip(chunk_scores, chunk_texts):
+        if scores is None:
+            # Fallback to keyword matching if Grok AI call fails
+            FALLBACKS.inc(kind='keyword_scoring')
+            if fallbacks is not None:
+                fallbacks.append('keyword_scoring')
+            scores = keyword_scorer.score_text(chunk_text)
+        for topic, score in scores:
+            doc_scores[topic] = max(doc_scores.get(topic, 0), score)
+    return doc_scores
+
+
+def compute_topic_weights(subject, document_contents, on_event=None, fallbacks=None):
+    """
+    Scores every document against the subject's curriculum with Grok AI and aggregates the scores.
+
+    Documents are read and split into chunks sized for the model's context window one at a
+    time; only chunk hashes are kept, so memory does not grow with the corpus. Identical chunks
+    (within or across documents) are only scored once, and chunks are scored concurrently
+    (bounded by GROQ_MAX_CONCURRENCY; the shared rate limiter keeps us within quota), with at
+    most twice that many chunks submitted at once.
+    Each document's weights are merged into the total as soon as all of its chunks are done,
+    and reported through `on_event('document', {...})` if given.
+    Chunks that fell back to keyword scoring are recorded in `fallbacks`, if given.
+    Returns a Counter of {topic: aggregated score}.
+    """
+    topic_weights = Counter() # Using Counter to store topic frequencies/importance scores
+    chunk_tokens = chunk_token_budget(
+        Config.GROQ_CONTEXT_TOKENS,
+        TOPIC_PROMPT_TEMPLATE.format(subject=subject.display_name, topics=', '.join(subject.topics), content=''),
+        Config.GROQ_COMPLETION_TOKEN_ESTIMATE,
+        Config.GROQ_CONTEXT_MARGIN,
+    )
+    max_in_flight = 2 * Config.GROQ_MAX_CONCURRENCY
+
+    doc_chunk_hashes = {} # doc path -> hashes of its chunks, until the document is merged
+    waiting_docs = {} # chunk hash -> documents waiting for it, while it is being scored
+    pending = {} # doc path -> number of its distinct chunks still being scored
+    chunk_results = {} # chunk hash -> scores (the chunk texts themselves are not kept)
+    documents_done = []
+    total_chunks = 0
+
+    def merge_document(doc_path):
+        hashes = doc_chunk_hashes.pop(doc_path)
+        chunk_scores = [chunk_results[h] for h in hashes]
+        # Texts are only needed for chunks falling back to keyword scoring: split the document again then
+        chunk_texts = split_into_chunks(document_contents[doc_path], chunk_tokens) if None in chunk_scores else [None] * len(hashes)
+        doc_scores = combine_chunk_scores(chunk_scores, chunk_texts, subject.keyword_scorer, fallbacks)
+        topic_weights.update(doc_scores) # Aggregate scores across documents
+        print(f"Analyzed document: {os.path.basename(doc_path)} ({len(hashes)} chunks, {len(doc_scores)} topics)")
+        documents_done.append(doc_path)
+        if on_event:
+            on_event('document', {
+                'document': os.path.basename(doc_path),
+                'documentsDone': len(documents_done),
+                'documentsTotal': len(document_contents),
+                'topics': doc_scores,
+            })
+
+    def collect(futures):
+        # Waits for at least one chunk and merges the documents it completes
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk_hash = futures.pop(future)
+            chunk_results[chunk_hash] = future.result()
+            for doc_path in waiting_docs.pop(chunk_hash):
+                pending[doc_path] -= 1
+                if pending[doc_path] == 0:
+                    merge_document(doc_path)
+
+    with ThreadPoolExecutor(max_workers=Config.GROQ_MAX_CONCURRENCY) as executor:
+        futures = {}
+        for doc_path, doc_content in document_contents.items():
+            hashes = []
+            for chunk in split_into_chunks(doc_content, chunk_tokens):
+                chunk_hash = content_hash(chunk)
+                hashes.append(chunk_hash)
+                if chunk_hash in chunk_results or chunk_hash in waiting_docs:
+                    continue # Already scored or being scored
+                while len(futures) >= max_in_flight:
+                    collect(futures)
+                waiting_docs[chunk_hash] = []
+                label = f"{os.path.basename(doc_path)} chunk {chunk_hash[:8]}"
+                futures[executor.submit(score_chunk_topics, label, chunk, subject.topics, subject.version, subject.display_name)] = chunk_hash
+            total_chunks += len(hashes)
+            doc_chunk_hashes[doc_path] = hashes
+            unscored = {h for h in hashes if h not in chunk_results}
+            for chunk_hash in unscored:
+                waiting_docs[chunk_hash].append(doc_path)
+            pending[doc_path] = len(unscored)
+            if not unscored:
+                merge_document(doc_path) # Everything already scored (or an empty document)
+        while futures:
+            collect(futures)
+
+    print(f"Split {len(document_contents)} documents into {total_chunks} chunks of up to {chunk_tokens} tokens "
+          f"({len(chunk_results)} unique).")
+    return topic_weights
+
+
+def generate_schedule_with_grok(days, target_score, sorted_weighted_topics, subject_name='Biology'):
+    """
+    Asks Grok AI to turn the weighted topics into a day-by-day schedule.
+    Returns the validated schedule, or an empty list if the call failed or the output was invalid.
+    """
     prompt_for_schedule = f"""
-    You are a study planner. Create a {days}-day study schedule for a student aiming for {target_score}% in Biology.
+    You are a study planner. Create a {days}-day study schedule for a student aiming for {target_score}% in {subject_name}.
     Prioritize the following topics based on their importance/weightage (higher score means more important/frequent in past exams):
     {json.dumps(sorted_weighted_topics)}
 
@@ -241,116 +472,468 @@ def analyze_and_generate_schedule(subject, days, target_score, curriculum_topics
 
     final_schedule = []
     try:
-        chat_completion_schedule = groq_client.chat.completions.create( # Uncommented: Grok AI call
-            messages=[
-                {"role": "user", "content": prompt_for_schedule}
-            ],
-            model="llama3-8b-8192", # Or another suitable Groq model
-            response_format={"type": "json_object"}
-        )
-        grok_schedule_response_text = chat_completion_schedule.choices[0].message.content
-        temp_parsed_schedule = json.loads(grok_schedule_response_text)
-        
-        # Validate the structure of the Grok AI generated schedule
-        if isinstance(temp_parsed_schedule, list) and all(isinstance(item, dict) and 'day' in item and 'topics' in item and isinstance(item['topics'], list) for item in temp_parsed_schedule):
+        grok_schedule_response_text = call_llm(prompt_for_schedule, 'schedule') # Uncommented: Grok AI call
+        with span('parse_schedule'):
+            temp_parsed_schedule = json.loads(grok_schedule_response_text)
+
+            # Validate the structure of the Grok AI generated schedule
+            valid = isinstance(temp_parsed_schedule, list) and all(isinstance(item, dict) and 'day' in item and 'topics' in item and isinstance(item['topics'], list) for item in temp_parsed_schedule)
+        if valid:
             final_schedule = temp_parsed_schedule
             print("Schedule generated by Grok AI.")
         else:
+            LLM_ERRORS.inc(purpose='schedule', reason='unexpected_format')
             print(f"Grok AI generated schedule in unexpected format: {grok_schedule_response_text[:200]}...")
-            print("Falling back to basic schedule generation.")
+            print("Falling back to local schedule generation.")
             # Proceed to fallback logic
+    except json.JSONDecodeError as e:
+        LLM_ERRORS.inc(purpose='schedule', reason='invalid_json')
+        print(f"Error generating schedule with Grok AI: {e}")
+        print("Falling back to local schedule generation.")
     except Exception as e:
         print(f"Error generating schedule with Grok AI: {e}")
-        print("Falling back to basic schedule generation.")
-        # Fallback if Grok AI schedule generation fails
-        pass
-
-    # --- FALLBACK/MOCK SCHEDULE GENERATION (IF GROK AI IS NOT USED OR FAILS) ---
-    # This section will be executed if Grok AI call is commented or fails, or if its output is invalid.
-    if not final_schedule: # Only run fallback if Grok AI didn't provide a valid schedule
-        print("Using fallback schedule generation.")
-        temp_schedule = [{"day": i + 1, "topics": []} for i in range(days)]
-        current_topic_idx = 0
-        
-        # Prepare topics for scheduling based on their weight (simple repetition)
-        all_topics_for_scheduling = []
-        if sorted_weighted_topics: # Use weighted topics if available
-            for topic, weight in sorted_weighted_topics:
-                # Add topic multiple times based on its weight. Max repetition for very high weight.
-                num_repetitions = max(1, int(weight / (sum(dict(sorted_weighted_topics).values()) / len(sorted_weighted_topics) / 2)))
-                all_topics_for_scheduling.extend([topic] * num_repetitions)
-        
-        # If no weighted topics or all_topics_for_scheduling is still empty (e.g., if Grok AI failed and no initial topics)
-        if not all_topics_for_scheduling and FLATTENED_TOPICS:
-            all_topics_for_scheduling = list(FLATTENED_TOPICS) # Fallback to all topics from curriculum
-        
-        # Ensure there are topics to schedule, otherwise use general days
-        if not all_topics_for_scheduling:
-            return [{"day": d, "topics": [f"General Study Day {d} - No specific topics found"]} for d in range(1, days + 1)]
+        print("Falling back to local schedule generation.")
 
+    return final_schedule
 
-        # Distribute topics across days
-        topics_per_slot = max(1, len(all_topics_for_scheduling) // days)
 
-        for day_idx in range(days):
-            topics_for_day = []
-            for _ in range(topics_per_slot):
-                if current_topic_idx < len(all_topics_for_scheduling):
-                    topics_for_day.append(all_topics_for_scheduling[current_topic_idx])
-                    current_topic_idx += 1
-            
-            # If a day ends up empty but there are remaining topics, add one
-            if not topics_for_day and current_topic_idx < len(all_topics_for_scheduling):
-                 topics_for_day.append(all_topics_for_scheduling[current_topic_idx])
-                 current_topic_idx += 1
+def score_topics(subject, document_contents, scoring_mode, on_event=None, fallbacks=None):
+    """
+    Runs the full topic analysis of `document_contents` with `scoring_mode` ('llm', 'keyword'
+    or 'tfidf'). Used per request, and offline by build_snapshot.py.
+    Returns a Counter of {topic: aggregated score}.
+    """
+    with span(f'topic_weights_{scoring_mode}'):
+        if scoring_mode == 'keyword':
+            print("\nStarting topic analysis using offline keyword matching...")
+            return subject.keyword_scorer.score_documents(document_contents)
+        if scoring_mode == 'tfidf':
+            print("\nStarting topic analysis using the TF-IDF index...")
+            return subject.tfidf_index.topic_weights(document_contents)
+        print("\nStarting topic analysis using Grok AI...")
+        return compute_topic_weights(subject, document_contents, on_event, fallbacks)
 
-            # If all specific topics are assigned, add a general review/practice day
-            if not topics_for_day:
-                topics_for_day.append("Review & Practice PYQs")
-            
-            # Remove duplicates for the same day (maintain order)
-            temp_schedule[day_idx]['topics'] = list(dict.fromkeys(topics_for_day))
 
-        final_schedule = temp_schedule
+# --- Core ML Logic: Analyze PYQs and Generate Schedule ---
+def analyze_and_generate_schedule(subject, days, target_score, document_contents, scoring_mode=None, schedule_mode=None, on_event=None, fallbacks=None):
+    """
+    This function will contain your Grok AI powered logic to:
+    1. Process document contents (from PYQs and textbooks).
+    2. Identify important topics based on frequency/weightage using the curriculum of `subject`
+       (a subjects.Subject).
+       `scoring_mode` selects Grok AI ('llm'), offline keyword ('keyword') or TF-IDF ('tfidf')
+       scoring and defaults to Config.TOPIC_SCORING_MODE.
+    3. Generate a comprehensive study schedule. `schedule_mode` selects Grok AI ('llm') or the
+       local optimizer ('local') and defaults to Config.SCHEDULE_MODE; 'llm' falls back to 'local' on failure.
+    `on_event(event, data)`, if given, receives progress as it happens: a 'document' event per
+    analyzed document (Grok AI scoring) and a 'weights' event with the aggregated topic weights.
+    `fallbacks`, if given, is filled with the offline fallbacks used because a Grok AI call failed.
+    """
+    if not subject.topics:
+        print(f"Warning: No {subject.name} topics loaded from curriculum. Cannot generate specific schedule.")
+        return [{"day": d, "topics": [f"General Study Day {d} - No specific topics (Curriculum not loaded)"]} for d in range(1, days + 1)]
 
+    # --- Step 1: Topic Extraction and Weightage Calculation ---
+    # Served from the subject's precomputed snapshot when it was built with this scoring mode
+    scoring_mode = scoring_mode or Config.TOPIC_SCORING_MODE
+    snapshot = subject.snapshot_for(scoring_mode)
+    if snapshot is not None:
+        print(f"\nUsing precomputed {scoring_mode} topic weights from snapshot {snapshot.provenance[:12]}...")
+        topic_weights = snapshot.topic_weights()
+    else:
+        topic_weights = score_topics(subject, document_contents, scoring_mode, on_event, fallbacks)
+
+    if not topic_weights:
+        print("No curriculum topics found in documents by Grok AI analysis. Generating generic schedule.")
+        return [{"day": d, "topics": [f"General Study Day {d} - No specific topics found"]} for d in range(1, days + 1)]
+
+    # Sort topics by their aggregated weightage in descending order
+    sorted_weighted_topics = sorted(topic_weights.items(), key=lambda item: item[1], reverse=True)
+    print("\nTopics by aggregated weightage (most important first):")
+    for topic, weight in sorted_weighted_topics:
+        print(f"  - {topic}: {weight}")
+    if on_event:
+        on_event('weights', {'topics': sorted_weighted_topics})
+
+    # --- Step 2: Schedule Generation Logic (Grok AI, or the local optimizer) ---
+    print(f"\nGenerating schedule for {days} days with target score {target_score}% using weighted topics...")
+    schedule_mode = schedule_mode or Config.SCHEDULE_MODE
+    final_schedule = []
+    if schedule_mode == 'llm' and llm_client is not None:
+        final_schedule = generate_schedule_with_grok(days, target_score, sorted_weighted_topics, subject.display_name)
+
+    # --- LOCAL SCHEDULE GENERATION (IF GROK AI IS NOT USED OR FAILS) ---
+    # Deterministic greedy packing with spaced revisions (see scheduler.py); no Grok AI call needed.
+    if not final_schedule:
+        if schedule_mode == 'llm':
+            FALLBACKS.inc(kind='local_schedule')
+            if fallbacks is not None:
+                fallbacks.append('local_schedule')
+        print("Using local schedule generation.")
+        unplaced = []
+        with span('schedule_build'):
+            final_schedule = build_schedule(sorted_weighted_topics, days, target_score, Config.SCHEDULE_MINUTES_PER_DAY, unplaced=unplaced)
+        if unplaced:
+            print(f"Schedule has no room for {len(unplaced)} lower-weight topics (e.g. {unplaced[0]}).")
 
     return final_schedule
 
 
-# --- API Endpoint for Schedule Generation ---
-@app.route('/api/generate-schedule', methods=['POST'])
-def generate_schedule_endpoint():
-    data = request.get_json()
+# --- Request Parsing and Response Cache for Schedule Generation ---
+# In-process LRU/TTL cache of generated schedules, optionally shared between workers via SQLite
+response_cache = ResponseCache(Config.RESPONSE_CACHE_MAX_ENTRIES, Config.RESPONSE_CACHE_TTL_SECONDS, Config.RESPONSE_CACHE_DB_PATH)
+
+
+def parse_whole_number(value):
+    """
+    Returns `value` as an int if it is a whole number (an integer, a float without a fractional
+    part, or a string holding an integer), else None.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_schedule_request(data):
+    """
+    Validates and normalizes a schedule request body.
+    Returns (params, None) on success, or (None, error_response) for invalid input.
+    """
+    data = data or {}
+    if not isinstance(data, dict):
+        return None, (jsonify({'message': 'Request body must be a JSON object.'}), 400)
     subject = data.get('subject')
     preparation_days = data.get('preparationDays')
     target_score = data.get('targetScore')
+    scoring_mode = data.get('scoringMode') # Optional: 'llm', 'keyword' or 'tfidf'
+    schedule_mode = data.get('scheduleMode') # Optional: 'llm' or 'local'
+
+    # Basic validation (a target score of 0 is valid, so check for presence rather than truthiness)
+    if not subject or preparation_days is None or target_score is None:
+        return None, (jsonify({'message': 'Missing required fields (subject, preparationDays, targetScore)'}), 400)
+
+    if not isinstance(subject, str):
+        return None, (jsonify({'message': 'subject must be a string.'}), 400)
+
+    if subject_key(subject) not in subject_registry:
+        return None, (jsonify({'message': f'Unsupported subject. Available subjects: {", ".join(subject_registry.names())}.'}), 400)
+
+    preparation_days = parse_whole_number(preparation_days)
+    target_score = parse_whole_number(target_score)
+    if preparation_days is None or target_score is None:
+        return None, (jsonify({'message': 'preparationDays and targetScore must be whole numbers.'}), 400)
+
+    # Out-of-range values would produce an empty schedule, or tie up a worker building a huge one
+    if not 1 <= preparation_days <= Config.MAX_PREPARATION_DAYS:
+        return None, (jsonify({'message': f'preparationDays must be between 1 and {Config.MAX_PREPARATION_DAYS}.'}), 400)
+    if not 0 <= target_score <= 100:
+        return None, (jsonify({'message': 'targetScore must be between 0 and 100.'}), 400)
+
+    if scoring_mode is not None and scoring_mode not in TOPIC_SCORING_MODES:
+        return None, (jsonify({'message': f'Invalid scoringMode. Use one of: {", ".join(TOPIC_SCORING_MODES)}.'}), 400)
+
+    if schedule_mode is not None and schedule_mode not in SCHEDULE_MODES:
+        return None, (jsonify({'message': f'Invalid scheduleMode. Use one of: {", ".join(SCHEDULE_MODES)}.'}), 400)
+
+    return {
+        'subject': subject_key(subject),
+        'preparationDays': preparation_days,
+        'targetScore': target_score,
+        'scoringMode': scoring_mode or Config.TOPIC_SCORING_MODE,
+        'scheduleMode': schedule_mode or Config.SCHEDULE_MODE,
+    }, None
 
-    # Basic validation
-    if not all([subject, preparation_days, target_score]):
-        return jsonify({'message': 'Missing required fields (subject, preparationDays, targetScore)'}), 400
 
-    if subject.lower() != 'biology':
-        return jsonify({'message': 'Currently only "Biology" subject is supported.'}), 400
+def schedule_cache_key(params, subject):
+    """
+    Builds the response cache key for normalized request `params` against the subject's current
+    corpus (or the snapshot serving the request) and curriculum and the settings that shape the
+    generated schedule.
+    """
+    snapshot = subject.snapshot_for(params['scoringMode'])
+    source_version = snapshot.provenance if snapshot is not None else subject.corpus_loader.version
+    return fingerprint(params, source_version, subject.version, llm_model(), Config.SCHEDULE_MINUTES_PER_DAY)
+
+
+def corpus_unavailable_response(subject, scoring_mode):
+    """
+    Returns the error response to send while the subject's corpus cannot serve schedule requests
+    with `scoring_mode`, or None. Requests served from a snapshot never wait for the corpus.
+    """
+    if subject.snapshot_for(scoring_mode) is not None:
+        return None
+    subject.corpus_loader.ensure_started() # Subjects with a snapshot only load their documents on demand (retried after a failure)
+    status = subject.corpus_loader.status()
+    if not subject.corpus_loader.is_ready and status['state'] == 'error':
+        return jsonify({'message': f'The {subject.display_name} document corpus could not be loaded.', 'error': status['error'], 'corpus': status}), 500
+    if not subject.corpus_loader.is_ready:
+        response = jsonify({'message': 'Document corpus is still loading. Please try again shortly.', 'corpus': status})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    if not subject.corpus_loader.documents:
+        return jsonify({'message': f'No PYQ or Textbook documents found or readable for {subject.display_name}. Check {subject.pyqs_dir} and {subject.textbooks_dir}.'}), 500
+    return None
+
+
+def generate_schedule_cached(params, subject, document_contents, cache_key, on_event=None):
+    """
+    Returns (schedule, cached): the schedule for `params`, served from the response cache
+    when possible and generated (then cached) otherwise.
+    Schedules degraded by a failed Grok AI call (keyword or local fallback) are not cached, so
+    a brief outage does not pin them for the whole TTL. Without an LLM backend configured the
+    fallbacks are the normal path and their results are cached.
+    """
+    cached_response = response_cache.get(cache_key)
+    CACHE_LOOKUPS.inc(cache='response', result='miss' if cached_response is None else 'hit')
+    if cached_response is not None:
+        return cached_response['schedule'], True
+    fallbacks = []
+    schedule = analyze_and_generate_schedule(
+        subject, # Curriculum, scorers and corpus of the requested subject
+        params['preparationDays'],
+        params['targetScore'],
+        document_contents, # Pass the combined content of all documents
+        params['scoringMode'],
+        params['scheduleMode'],
+        on_event=on_event,
+        fallbacks=fallbacks,
+    )
+    if fallbacks and llm_client is not None:
+        print(f"Not caching schedule: Grok AI fell back to offline results ({', '.join(sorted(set(fallbacks)))}).")
+    else:
+        response_cache.put(cache_key, {'schedule': schedule})
+    return schedule, False
 
-    if not ALL_DOCUMENT_CONTENTS:
-        return jsonify({'message': 'No PYQ or Textbook documents found or readable in data directories. Check data/pyqs and data/textbooks.'}), 500
 
+# --- API Endpoint for Schedule Generation ---
+@app.route('/api/generate-schedule', methods=['POST'])
+def generate_schedule_endpoint():
+    params, error_response = parse_schedule_request(request.get_json())
+    if error_response:
+        return error_response
+
+    subject = subject_registry.get(params['subject'])
+    unavailable_response = corpus_unavailable_response(subject, params['scoringMode'])
+    if unavailable_response:
+        return unavailable_response
+
+    # Serve repeat requests from the response cache; the key includes the corpus and curriculum
+    # versions, so adding or editing a document automatically invalidates older entries.
+    cache_key = schedule_cache_key(params, subject)
     try:
-        schedule = analyze_and_generate_schedule(
-            subject,
-            preparation_days,
-            target_score,
-            FLATTENED_TOPICS, # Pass the flattened list of curriculum topics
-            ALL_DOCUMENT_CONTENTS # Pass the combined content of all documents
-        )
-        return jsonify({'schedule': schedule}), 200
+        schedule, cached = generate_schedule_cached(params, subject, subject.corpus_loader.documents, cache_key)
+        response = jsonify({'schedule': schedule})
+        response.headers['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response, 200
     except Exception as e:
         print(f"An error occurred during schedule generation: {e}")
         import traceback
         traceback.print_exc() # Print full traceback to console
         return jsonify({'message': 'Failed to generate schedule due to an internal error.', 'error': str(e)}), 500
 
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    return jsonify({'responses': response_cache.stats()}), 200
+
+# --- Streaming API Endpoint for Schedule Generation (Server-Sent Events) ---
+def sse_event(event, data):
+    """
+    Formats one Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/generate-schedule/stream', methods=['POST'])
+def generate_schedule_stream_endpoint():
+    """
+    Same input as /api/generate-schedule, but answers immediately with a text/event-stream:
+    'start', then 'document' events as each document is analyzed, 'weights' once topics are
+    ranked, one 'day' event per schedule day, and finally 'done' (or 'error').
+    """
+    params, error_response = parse_schedule_request(request.get_json())
+    if error_response:
+        return error_response
+
+    subject = subject_registry.get(params['subject'])
+    unavailable_response = corpus_unavailable_response(subject, params['scoringMode'])
+    if unavailable_response:
+        return unavailable_response
+
+    document_contents = subject.corpus_loader.documents
+    cache_key = schedule_cache_key(params, subject)
+    events = queue.Queue()
+
+    def run():
+        # Runs outside the request thread, so it keeps going (and fills the cache) even if the client disconnects
+        try:
+            schedule, cached = generate_schedule_cached(params, subject, document_contents, cache_key,
+                                                        on_event=lambda event, data: events.put((event, data)))
+            for day_plan in schedule:
+                events.put(('day', day_plan))
+            events.put(('done', {'days': len(schedule), 'cached': cached}))
+        except Exception as e:
+            print(f"An error occurred during streamed schedule generation: {e}")
+            import traceback
+            traceback.print_exc() # Print full traceback to console
+            events.put(('error', {'message': 'Failed to generate schedule due to an internal error.', 'error': str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=run, name='schedule-stream', daemon=True).start()
+
+    def stream():
+        yield sse_event('start', {**params, 'documents': len(document_contents)})
+        while True:
+            try:
+                item = events.get(timeout=Config.STREAM_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n" # Comment line keeps proxies from closing an idle stream
+                continue
+            if item is None:
+                return
+            yield sse_event(*item)
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- Asynchronous Job API for Schedule Generation ---
+def run_schedule_job(job_params):
+    """
+    Worker-side body of a schedule job. The corpus version the job was submitted against is
+    part of its parameters; if the corpus has been reloaded since, the current one is used.
+    """
+    params = {key: value for key, value in job_params.items() if key != 'corpusVersion'}
+    subject = subject_registry.get(params['subject'])
+    if subject.snapshot_for(params['scoringMode']) is None:
+        subject.corpus_loader.ensure_started()
+        # The subject may have been unloaded and reloaded since the job was queued
+        if not subject.corpus_loader.wait():
+            raise RuntimeError(f"The {subject.display_name} document corpus could not be loaded: {subject.corpus_loader.error}")
+    schedule, cached = generate_schedule_cached(params, subject, subject.corpus_loader.documents, schedule_cache_key(params, subject))
+    return {'schedule': schedule, 'cached': cached}
+
+
+# Jobs run on a small local thread pool; their state lives in SQLite so any web worker can answer polls
+job_queue = JobQueue(Config.JOB_DB_PATH, run_schedule_job, Config.JOB_WORKERS, Config.JOB_MAX_PENDING, Config.JOB_RETENTION_SECONDS)
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job_endpoint():
+    """
+    Same input as /api/generate-schedule, but queues the work and answers 202 with a job id
+    to poll at /api/jobs/<id>. Identical requests share one in-flight job.
+    """
+    params, error_response = parse_schedule_request(request.get_json())
+    if error_response:
+        return error_response
+
+    subject = subject_registry.get(params['subject'])
+    unavailable_response = corpus_unavailable_response(subject, params['scoringMode'])
+    if unavailable_response:
+        return unavailable_response
+
+    cache_key = schedule_cache_key(params, subject)
+    try:
+        job, created = job_queue.submit(cache_key, {**params, 'corpusVersion': subject.corpus_loader.version})
+    except QueueFullError as e:
+        response = jsonify({'message': 'Too many schedules are being generated. Please try again shortly.', 'error': str(e)})
+        response.headers['Retry-After'] = '10'
+        return response, 503
+
+    response = jsonify({**job, 'deduplicated': not created})
+    response.headers['Location'] = f"/api/jobs/{job['jobId']}"
+    return response, 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'message': 'Job not found.'}), 404
+    response = jsonify(job)
+    if job['status'] in ('queued', 'running'):
+        response.headers['Retry-After'] = '2' # Suggested polling interval
+    return response, 200
+
+# --- API Endpoints for Subjects, Corpus Loading Status and Reload ---
+@app.route('/api/subjects', methods=['GET'])
+def subjects_endpoint():
+    loaded = {subject.name: subject for subject in subject_registry.loaded()}
+    subjects = [loaded[name].summary() if name in loaded else {'subject': name, 'name': name.replace('_', ' ').title(), 'corpus': None}
+                for name in subject_registry.names()]
+    return jsonify({'subjects': subjects}), 200
+
+
+@app.route('/api/subjects/<name>', methods=['GET'])
+def subject_detail_endpoint(name):
+    try:
+        subject = subject_registry.get(subject_key(name))
+    except KeyError:
+        return jsonify({'message': 'Subject not found.'}), 404
+    if subject.corpus_loader.is_ready:
+        weights = subject.tfidf_index.topic_weights()
+    else:
+        weights = subject.snapshot.topic_weights() if subject.snapshot else {}
+    return jsonify({
+        **subject.summary(),
+        'curriculum': subject.curriculum,
+        'topicWeights': [{'topic': topic, 'chapter': subject.topic_chapters.get(topic), 'weight': weight}
+                         for topic, weight in weights.most_common()] if weights else [],
+    }), 200
+
+
+def requested_subject():
+    """
+    Returns the Subject named by the `subject` query parameter (Biology by default), or None if unknown.
+    """
+    try:
+        return subject_registry.get(subject_key(request.args.get('subject', Config.DEFAULT_SUBJECT)))
+    except KeyError:
+        return None
+
+
+@app.route('/api/corpus/status', methods=['GET'])
+def corpus_status_endpoint():
+    subject = requested_subject()
+    if subject is None:
+        return jsonify({'message': 'Subject not found.'}), 404
+    return jsonify(subject.corpus_loader.status()), 200
+
+
+@app.route('/api/corpus/reload', methods=['POST'])
+def corpus_reload_endpoint():
+    subject = requested_subject()
+    if subject is None:
+        return jsonify({'message': 'Subject not found.'}), 404
+    started = subject.corpus_loader.start()
+    message = 'Corpus reload started.' if started else 'Corpus is already loading.'
+    return jsonify({'message': message, 'corpus': subject.corpus_loader.status()}), 202
+
+
+@app.route('/api/corpus/rescan', methods=['POST'])
+def corpus_rescan_endpoint():
+    """
+    Compares the subject's document directories with its loaded corpus and, if files were
+    added, changed or deleted, starts an incremental reload of just those files.
+    """
+    subject = requested_subject()
+    if subject is None:
+        return jsonify({'message': 'Subject not found.'}), 404
+    changes = corpus_watcher.check(subject)
+    if changes is None:
+        return jsonify({'message': 'Corpus is still loading.', 'corpus': subject.corpus_loader.status()}), 202
+    has_changes = changes['added'] or changes['changed'] or changes['removed']
+    message = 'Corpus update started.' if has_changes else 'Corpus is up to date.'
+    return jsonify({'message': message, **changes, 'corpus': subject.corpus_loader.status()}), 202 if has_changes else 200
+
 # --- Run the Flask app ---
 if __name__ == '__main__':
+    if Config.DEFAULT_SUBJECT in subject_registry:
+        subject_registry.get(Config.DEFAULT_SUBJECT) # Begin reading its documents right away instead of waiting for the first request
     # Temporarily set debug=False to prevent immediate restarts and see the error
     app.run(debug=False, port=5000)
\ No newline at end of file
@@ -0,0 +1,381 @@
+# scheduler/backend/benchmark.py
+"""
+Benchmarks the schedule pipeline on synthetic data, without network access.
+
+For each corpus size, a synthetic curriculum and corpus of PDF/TXT files is generated in a
+temporary directory, and the following stages are measured:
+
+- ingest:     extracting text from all files (throughput) and from single files (latency)
+- weighting:  topic weights with keyword, TF-IDF and LLM scoring (the LLM is FakeLLMClient
+              with --llm-latency-ms of simulated latency)
+- scheduling: the local scheduler for a 30/180/365-day plan
+- http:       POST /api/generate-schedule through the Flask test client: TF-IDF scoring with the
+              local scheduler (uncached and cached), and LLM scoring with LLM schedule generation
+              (uncached, including the topic score cache; --llm-repeat calls)
+
+Each result has throughput, p50/p99 latency and peak Python memory (tracemalloc; the ingest
+worker processes are not included). Results are written as JSON to --output-dir and compared
+with the previous run found there, so regressions show up between versions.
+
+Usage:
+    python benchmark.py --sizes 10,100,1000 --repeat 20
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+SUBJECT = 'bench'
+SCHEDULE_DAYS = (30, 180, 365)
+
+
+# --- Synthetic data ---
+def make_vocabulary(rng, size):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return sorted(words)
+
+
+def make_curriculum(rng, vocabulary, chapters, topics_per_chapter):
+    """
+    Returns {chapter: [topic, ...]} with topics made of 2-3 vocabulary words.
+    """
+    curriculum = {}
+    for c in range(chapters):
+        topics = []
+        for _ in range(topics_per_chapter):
+            topics.append(' '.join(rng.choice(vocabulary).title() for _ in range(rng.randint(2, 3))))
+        curriculum[f"Chapter {c + 1}: {rng.choice(vocabulary).title()}"] = topics
+    return curriculum
+
+
+def make_document(rng, vocabulary, topics, words):
+    """
+    Returns `words` words of filler text with curriculum topic phrases mixed in (about 10%).
+    """
+    out = []
+    while len(out) < words:
+        if rng.random() < 0.1:
+            out.extend(rng.choice(topics).lower().split())
+        else:
+            out.append(rng.choice(vocabulary))
+    return ' '.join(out)
+
+
+def write_pdf(path, text, words_per_line=12, lines_per_page=50):
+    """
+    Writes `text` as a minimal multi-page PDF (Helvetica, one Tj per line) that PyPDF2 can extract.
+    """
+    words = text.split()
+    lines = [' '.join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line)] or ['']
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        stream = "BT /F1 10 Tf 40 800 Td 12 TL " + ' '.join(f"({line}) Tj T*" for line in page_lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode('latin-1'))
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode('latin-1'))
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode('latin-1')
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode('latin-1') + body + b"\nendobj\n"
+    xref_offset = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    data += b''.join(f"{offset:010d} 00000 n \n".encode('latin-1') for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('latin-1')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def generate_corpus(data_dir, size, args, rng):
+    """
+    Writes `<SUBJECT>_curriculum.json` and `size` documents into `data_dir/<SUBJECT>/pyqs`.
+    Returns (curriculum, document paths).
+    """
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    curriculum = make_curriculum(rng, vocabulary, args.chapters, args.topics_per_chapter)
+    topics = [topic for chapter_topics in curriculum.values() for topic in chapter_topics]
+    with open(os.path.join(data_dir, f"{SUBJECT}_curriculum.json"), 'w', encoding='utf-8') as f:
+        json.dump({SUBJECT: curriculum}, f)
+
+    pyqs_dir = os.path.join(data_dir, SUBJECT, 'pyqs')
+    os.makedirs(pyqs_dir, exist_ok=True)
+    paths = []
+    for i in range(size):
+        text = make_document(rng, vocabulary, topics, args.words_per_document)
+        if rng.random() < args.pdf_share:
+            path = os.path.join(pyqs_dir, f"paper_{i:05d}.pdf")
+            write_pdf(path, text)
+        else:
+            path = os.path.join(pyqs_dir, f"paper_{i:05d}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        paths.append(path)
+    return curriculum, paths
+
+
+# --- Measurement helpers ---
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences the pipeline's progress prints while a stage is measured.
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def time_calls(fn, repeat):
+    """
+    Calls `fn` `repeat` times and returns the latency of each call in seconds.
+    """
+    latencies = []
+    with quiet():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def peak_memory_mb(fn):
+    """
+    Runs `fn` once under tracemalloc and returns its peak Python allocation in MB.
+    """
+    tracemalloc.start()
+    try:
+        with quiet():
+            fn()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(stage, size, latencies, items_per_call, unit, peak_mb):
+    total = sum(latencies)
+    result = {
+        'stage': stage,
+        'size': size,
+        'calls': len(latencies),
+        'throughput': round(items_per_call * len(latencies) / total, 2) if total else None,
+        'unit': unit,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'peak_mb': round(peak_mb, 2),
+    }
+    print(f"  {stage:<28} p50 {result['p50_ms']:>10.2f} ms   p99 {result['p99_ms']:>10.2f} ms   "
+          f"{result['throughput'] or 0:>10.1f} {unit}   peak {result['peak_mb']:>8.2f} MB")
+    return result
+
+
+# --- Stages ---
+def bench_ingest(size, paths, args):
+    from ingest import ingest_documents
+
+    results = []
+    batch = lambda: ingest_documents(paths, cache=None, max_workers=args.ingest_workers)
+    latencies = time_calls(batch, 1)
+    results.append(summarize('ingest.batch', size, latencies, len(paths), 'files/s', peak_memory_mb(batch)))
+
+    sample = paths[:args.latency_sample]
+    single = [time_calls(lambda path=path: ingest_documents([path], max_workers=1), 1)[0] for path in sample]
+    results.append(summarize('ingest.file', size, single, 1, 'files/s', peak_memory_mb(lambda: ingest_documents(sample[:1], max_workers=1))))
+    return results
+
+
+def bench_weighting(size, app, subject, args):
+    documents = subject.corpus_loader.documents
+    results = []
+
+    keyword = lambda: subject.keyword_scorer.score_documents(documents)
+    results.append(summarize('weighting.keyword', size, time_calls(keyword, args.repeat), len(documents), 'docs/s', peak_memory_mb(keyword)))
+
+    def tfidf():
+        subject.tfidf_index._topic_weights = None # Measure the sparse-matrix weighting, not the memoized result
+        subject.tfidf_index.topic_weights(documents)
+    results.append(summarize('weighting.tfidf', size, time_calls(tfidf, args.repeat), len(documents), 'docs/s', peak_memory_mb(tfidf)))
+
+    def llm():
+        app.topic_score_cache.clear() # Measure real (fake) LLM calls, not cache hits
+        app.compute_topic_weights(subject, documents)
+    llm_repeat = max(1, min(args.repeat, args.llm_repeat))
+    results.append(summarize('weighting.llm', size, time_calls(llm, llm_repeat), len(documents), 'docs/s', peak_memory_mb(llm)))
+    return results
+
+
+def bench_scheduling(size, subject, args):
+    from scheduler import build_schedule
+
+    weights = sorted(subject.keyword_scorer.score_documents(subject.corpus_loader.documents).items(), key=lambda item: item[1], reverse=True)
+    results = []
+    for days in SCHEDULE_DAYS:
+        build = lambda: build_schedule(weights, days, 85)
+        results.append(summarize(f'scheduling.{days}d', size, time_calls(build, args.repeat), days, 'days/s', peak_memory_mb(build)))
+    return results
+
+
+def bench_http(size, app, args):
+    client = app.app.test_client()
+    body = {'subject': SUBJECT, 'preparationDays': 90, 'targetScore': 85, 'scoringMode': 'tfidf', 'scheduleMode': 'local'}
+
+    def post():
+        response = client.post('/api/generate-schedule', json=body)
+        assert response.status_code == 200, response.get_json()
+
+    def uncached():
+        app.response_cache.clear()
+        post()
+
+    results = [summarize('http.uncached', size, time_calls(uncached, args.repeat), 1, 'req/s', peak_memory_mb(uncached))]
+    post() # Warm the response cache
+    results.append(summarize('http.cached', size, time_calls(post, args.repeat), 1, 'req/s', peak_memory_mb(post)))
+
+    # The default request: Grok AI (here the fake) scores every chunk and writes the schedule
+    llm_body = {**body, 'scoringMode': 'llm', 'scheduleMode': 'llm'}
+
+    def llm_uncached():
+        app.response_cache.clear()
+        app.topic_score_cache.clear() # Measure real (fake) LLM calls, not cache hits
+        response = client.post('/api/generate-schedule', json=llm_body)
+        assert response.status_code == 200, response.get_json()
+    llm_repeat = max(1, min(args.repeat, args.llm_repeat))
+    results.append(summarize('http.llm.uncached', size, time_calls(llm_uncached, llm_repeat), 1, 'req/s', peak_memory_mb(llm_uncached)))
+    return results
+
+
+# --- Results ---
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare_with_previous(output_dir, current_path, results):
+    """
+    Prints the p50 change of each result against the most recent earlier results file.
+    """
+    previous_files = sorted(name for name in os.listdir(output_dir)
+                            if name.endswith('.json') and os.path.join(output_dir, name) != current_path)
+    if not previous_files:
+        return
+    with open(os.path.join(output_dir, previous_files[-1]), 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    previous_results = {(r['stage'], r['size']): r for r in previous['results']}
+    print(f"\nChange in p50 latency vs {previous_files[-1]} (revision {previous.get('revision')}):")
+    for result in results:
+        before = previous_results.get((result['stage'], result['size']))
+        if before and before['p50_ms']:
+            change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            print(f"  {result['stage']:<28} size {result['size']:>6}: {before['p50_ms']:>10.2f} -> {result['p50_ms']:>10.2f} ms ({change:+.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated corpus sizes (number of files), e.g. 10,100,1000,10000')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed calls per stage')
+    parser.add_argument('--llm-repeat', type=int, default=3, help='Timed calls for LLM weighting (slower)')
+    parser.add_argument('--llm-latency-ms', type=int, default=50, help='Simulated latency of each fake LLM call')
+    parser.add_argument('--latency-sample', type=int, default=50, help='Files extracted one by one for per-file latency')
+    parser.add_argument('--ingest-workers', type=int, default=0, help='Ingestion worker processes (0 = CPU count)')
+    parser.add_argument('--words-per-document', type=int, default=2000)
+    parser.add_argument('--pdf-share', type=float, default=0.5, help='Share of documents written as PDF (the rest are TXT)')
+    parser.add_argument('--chapters', type=int, default=12)
+    parser.add_argument('--topics-per-chapter', type=int, default=8)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results'))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.ingest_workers = args.ingest_workers or None
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    all_results = []
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='scheduler-bench-') as work_dir:
+            data_dir = os.path.join(work_dir, 'data')
+            cache_dir = os.path.join(work_dir, 'cache')
+            os.makedirs(data_dir)
+            # Point every cache at the scratch directory and use the fake LLM; Config reads these on import
+            os.environ.update({
+                'LLM_BACKEND': 'fake',
+                'EXTRACTION_CACHE_DIR': os.path.join(cache_dir, 'extracted'),
+                'CORPUS_STORE_DIR': os.path.join(cache_dir, 'corpus'),
+                'TFIDF_INDEX_DIR': os.path.join(cache_dir, 'tfidf_index'),
+                'TOPIC_CACHE_PATH': os.path.join(cache_dir, 'topic_scores.sqlite3'),
+                'JOB_DB_PATH': os.path.join(cache_dir, 'jobs.sqlite3'),
+                'CORPUS_WATCH_INTERVAL_SECONDS': '0',
+                'RESPONSE_CACHE_DB_PATH': '',
+            })
+            for module in ('app', 'config'):
+                sys.modules.pop(module, None) # Re-import with this size's settings
+            with quiet():
+                import app
+            from llm_client import FakeLLMClient
+            from subjects import SubjectRegistry
+
+            print(f"\n=== {size} documents ===")
+            started = time.perf_counter()
+            curriculum, paths = generate_corpus(data_dir, size, args, random.Random(args.seed))
+            print(f"  Generated corpus in {time.perf_counter() - started:.1f}s")
+
+            all_results.extend(bench_ingest(size, paths, args))
+
+            topics = [topic for chapter_topics in curriculum.values() for topic in chapter_topics]
+            app.llm_client = FakeLLMClient(args.llm_latency_ms / 1000, topics)
+            app.subject_registry = SubjectRegistry(data_dir, app.load_corpus, app.Config.TFIDF_INDEX_DIR, app.Config.CORPUS_STORE_DIR)
+            with quiet():
+                subject = app.subject_registry.get(SUBJECT)
+                subject.corpus_loader.wait()
+
+            all_results.extend(bench_weighting(size, app, subject, args))
+            all_results.extend(bench_scheduling(size, subject, args))
+            all_results.extend(bench_http(size, app, args))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    revision = git_revision()
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    output_path = os.path.join(args.output_dir, f"{timestamp}-{revision}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'revision': revision,
+            'timestamp': timestamp,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'settings': {key: value for key, value in vars(args).items() if key != 'output_dir'},
+            'results': all_results,
+        }, f, indent=2)
+    print(f"\nResults saved to {output_path}")
+    compare_with_previous(args.output_dir, output_path, all_results)
+
+
+if __name__ == '__main__':
+    main()
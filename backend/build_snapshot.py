@@ -0,0 +1,97 @@
+# scheduler/backend/build_snapshot.py
+"""
+Builds the topic-weight snapshots served by app.py.
+
+For each subject, the full document corpus is analyzed once with the chosen scoring mode
+(Grok AI, keyword or TF-IDF; the same analysis a request would run) and the resulting weights
+are written to SNAPSHOT_DIR/<subject>.npz: one array indexed by topic ID (the topic's position
+in the subject's curriculum) plus the versions it was built from and a provenance hash.
+
+At startup the app loads these snapshots, and requests with the snapshot's scoring mode are
+answered from them, so a server with snapshots needs neither the PDFs nor a Groq key.
+Rebuild after changing documents, curricula or the topic prompt.
+
+Usage:
+    python build_snapshot.py --scoring-mode llm
+    python build_snapshot.py --subjects biology --scoring-mode tfidf
+"""
+
+import argparse
+import sys
+import time
+
+import app
+from config import Config
+from snapshot import snapshot_path, write_snapshot
+
+
+def build_subject_snapshot(name, scoring_mode, snapshot_dir, allow_fallbacks=False):
+    """
+    Analyzes the documents of subject `name` and writes its snapshot.
+    Unless `allow_fallbacks` is set, no snapshot is written if any Grok AI call failed and fell
+    back to keyword scoring: snapshots never expire, so they must not pin a degraded result.
+    Returns the snapshot metadata, or None if the subject has no readable documents or the analysis fell back.
+    """
+    subject = app.subject_registry.get(name)
+    subject.corpus_loader.ensure_started() # Not started automatically when an older snapshot exists
+    if not subject.corpus_loader.wait() or not subject.corpus_loader.documents:
+        print(f"Error: No PYQ or Textbook documents found or readable for {subject.display_name}. "
+              f"Check {subject.pyqs_dir} and {subject.textbooks_dir}.")
+        return None
+
+    started = time.perf_counter()
+    fallbacks = []
+    topic_weights = app.score_topics(subject, subject.corpus_loader.documents, scoring_mode, fallbacks=fallbacks)
+    if fallbacks and not allow_fallbacks:
+        print(f"Error: Not writing the {subject.display_name} snapshot: {len(fallbacks)} chunk(s) fell back to keyword scoring "
+              f"because their Grok AI call failed. Try again later, or pass --allow-fallbacks to write it anyway.")
+        return None
+    metadata = {
+        'subject': name,
+        'scoringMode': scoring_mode,
+        'curriculumVersion': subject.version,
+        'corpusVersion': subject.corpus_loader.version,
+        'documents': len(subject.corpus_loader.documents),
+        'createdAt': time.time(),
+    }
+    if scoring_mode == 'llm':
+        metadata.update({'model': app.llm_model(), 'promptVersion': app.TOPIC_PROMPT_VERSION})
+    if fallbacks:
+        metadata['fallbackChunks'] = len(fallbacks)
+    path = snapshot_path(snapshot_dir, name)
+    metadata = write_snapshot(path, subject.topics, topic_weights, metadata)
+    weighted = sum(1 for topic in subject.topics if topic_weights.get(topic, 0) > 0)
+    print(f"Wrote {scoring_mode} snapshot of {subject.display_name} to {path}: {weighted} of {len(subject.topics)} "
+          f"curriculum topics weighted, {len(metadata['extraTopics'])} other topics, "
+          f"provenance {metadata['provenance'][:12]} ({time.perf_counter() - started:.2f}s).")
+    return metadata
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subjects', default='', help='Comma-separated subjects to build (default: all subjects)')
+    parser.add_argument('--scoring-mode', choices=app.TOPIC_SCORING_MODES, default=Config.TOPIC_SCORING_MODE,
+                        help='Topic scoring used for the analysis (default: TOPIC_SCORING_MODE)')
+    parser.add_argument('--output-dir', default=Config.SNAPSHOT_DIR, help='Directory the snapshots are written to (default: SNAPSHOT_DIR)')
+    parser.add_argument('--allow-fallbacks', action='store_true',
+                        help='Write snapshots even if some Grok AI calls failed and fell back to keyword scoring')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.scoring_mode == 'llm' and app.llm_client is None:
+        print("Error: --scoring-mode llm needs GROQ_API_KEY (or LLM_BACKEND=fake). Use keyword or tfidf to build offline.")
+        return 1
+    names = [name.strip().lower() for name in args.subjects.split(',') if name.strip()] or app.subject_registry.names()
+    unknown = [name for name in names if name not in app.subject_registry]
+    if unknown:
+        print(f"Error: Unknown subject(s): {', '.join(unknown)}. Available subjects: {', '.join(app.subject_registry.names())}.")
+        return 1
+
+    failed = [name for name in names if build_subject_snapshot(name, args.scoring_mode, args.output_dir, args.allow_fallbacks) is None]
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# scheduler/backend/chunking.py
+
+from rate_limit import CHARS_PER_TOKEN, estimate_tokens
+
+# Never make chunks smaller than this, even if the prompt leaves little room
+MIN_CHUNK_TOKENS = 256
+
+# Share of the context window filled with estimated tokens. estimate_tokens() assumes
+# CHARS_PER_TOKEN characters per token, but extracted exam text (numbers, symbols, broken
+# words) often packs more tokens per character; the margin keeps such chunks within the window.
+DEFAULT_TOKEN_MARGIN = 0.75
+
+
+def chunk_token_budget(context_tokens, prompt_without_content, completion_tokens, margin=DEFAULT_TOKEN_MARGIN):
+    """
+    Returns how many (estimated) tokens of document text fit in one request, given the model's
+    context window, the prompt that wraps the text and the tokens reserved for the completion.
+    Prompt and text together are kept to `margin` of the room left after the completion.
+    """
+    return max(MIN_CHUNK_TOKENS, int((context_tokens - completion_tokens) * margin) - estimate_tokens(prompt_without_content))
+
+
+def split_into_chunks(text, max_tokens):
+    """
+    Splits `text` into chunks of at most `max_tokens` (estimated) tokens.
+    Chunks end on a paragraph, line or word boundary where possible, and whitespace inside
+    each chunk is collapsed so identical passages produce identical chunks.
+    Returns a list of non-empty chunk strings.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            # Prefer the last natural break in the second half of the window
+            for separator in ('\n\n', '\n', ' '):
+                cut = text.rfind(separator, start + max_chars // 2, end)
+                if cut != -1:
+                    end = cut + len(separator)
+                    break
+        chunk = ' '.join(text[start:end].split())
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
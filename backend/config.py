@@ -1,6 +1,10 @@
 # scheduler/backend/config.py
 
 import os
+from dotenv import load_dotenv
+
+# Load .env here as well, so settings are read correctly whichever module imports Config first
+load_dotenv()
 
 class Config:
     """
@@ -17,10 +21,85 @@ class Config:
     PYQS_DIR = os.path.join(DATA_DIR, 'pyqs')
     TEXTBOOKS_DIR = os.path.join(DATA_DIR, 'textbooks')
 
+    # Subjects are discovered from data/<subject>_curriculum.json and loaded on first use.
+    # At most SUBJECT_CACHE_MAX_LOADED subjects (and roughly SUBJECT_CACHE_MAX_MB of their indexes
+    # and corpus) stay loaded; the least recently used ones are unloaded beyond that.
+    DEFAULT_SUBJECT = os.getenv('DEFAULT_SUBJECT', 'biology')
+    SUBJECT_CACHE_MAX_LOADED = int(os.getenv('SUBJECT_CACHE_MAX_LOADED', '4'))
+    SUBJECT_CACHE_MAX_BYTES = int(float(os.getenv('SUBJECT_CACHE_MAX_MB', '0')) * 1024 * 1024) or None # 0 = no size limit
+
+    # On-disk cache of text extracted from PYQ/textbook files (keyed by file content hash), one directory per subject
+    EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', os.path.join(DATA_DIR, '.cache', 'extracted'))
+
+    # Memory-mapped corpus store (one UTF-8 blob plus an offset index) shared by all web workers
+    CORPUS_STORE_DIR = os.getenv('CORPUS_STORE_DIR', os.path.join(DATA_DIR, '.cache', 'corpus'))
+
+    # Seconds between checks of the document directories for added/changed/deleted files (0 = only on /api/corpus/rescan)
+    CORPUS_WATCH_INTERVAL_SECONDS = int(os.getenv('CORPUS_WATCH_INTERVAL_SECONDS', '30'))
+
+    # Number of worker processes used to extract PDFs (defaults to the number of CPU cores)
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '0')) or None
+
+    # Default topic scoring backend: 'llm' (Grok AI), 'keyword' (offline keyword matching) or 'tfidf' (TF-IDF index)
+    TOPIC_SCORING_MODE = os.getenv('TOPIC_SCORING_MODE', 'llm')
+
+    # Default schedule builder: 'llm' (Grok AI, falls back to local) or 'local' (deterministic optimizer, no Groq call)
+    SCHEDULE_MODE = os.getenv('SCHEDULE_MODE', 'llm')
+    SCHEDULE_MINUTES_PER_DAY = int(os.getenv('SCHEDULE_MINUTES_PER_DAY', '240')) # Study time budget per day
+    MAX_PREPARATION_DAYS = int(os.getenv('MAX_PREPARATION_DAYS', '730')) # Longest schedule a request may ask for
+
+    # Cache of generated schedules for repeat requests; set RESPONSE_CACHE_DB_PATH to share it between workers
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '3600')) or None # 0 = never expire
+    RESPONSE_CACHE_DB_PATH = os.getenv('RESPONSE_CACHE_DB_PATH') or None
+
+    # Seconds of silence after which the streaming endpoint sends a keep-alive comment
+    STREAM_KEEPALIVE_SECONDS = int(os.getenv('STREAM_KEEPALIVE_SECONDS', '15'))
+
+    # Background schedule jobs (/api/jobs): worker threads, queue bound and how long finished jobs are kept
+    JOB_DB_PATH = os.getenv('JOB_DB_PATH', os.path.join(DATA_DIR, '.cache', 'jobs.sqlite3'))
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '32')) # Further submissions get 503 until the queue drains
+    JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', str(24 * 3600)))
+
+    # Directory holding the persisted TF-IDF keyword index
+    TFIDF_INDEX_DIR = os.getenv('TFIDF_INDEX_DIR', os.path.join(DATA_DIR, '.cache', 'tfidf_index'))
+
+    # Precomputed topic-weight snapshots (<subject>.npz, written by build_snapshot.py). A subject with a
+    # snapshot serves requests of the snapshot's scoring mode without reading its documents or calling Grok AI.
+    SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(DATA_DIR, 'snapshots'))
+
+    # LLM backend: 'groq' (Grok AI, disabled without GROQ_API_KEY) or 'fake' (local canned responses for benchmarks/offline use)
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'groq')
+    FAKE_LLM_LATENCY_MS = int(os.getenv('FAKE_LLM_LATENCY_MS', '0')) # Simulated response time of the fake backend
+
+    # Groq model used for topic scoring and schedule generation
+    GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama3-8b-8192')
+    GROQ_CONTEXT_TOKENS = int(os.getenv('GROQ_CONTEXT_TOKENS', '8192')) # Context window of GROQ_MODEL; documents are chunked to fit
+    GROQ_CONTEXT_MARGIN = float(os.getenv('GROQ_CONTEXT_MARGIN', '0.75')) # Share of the window filled with estimated tokens (estimates run low on PDF text)
+
+    # Concurrency and rate limits for Groq calls (match these to your Groq plan's quotas)
+    GROQ_MAX_CONCURRENCY = int(os.getenv('GROQ_MAX_CONCURRENCY', '4'))
+    GROQ_REQUESTS_PER_MINUTE = int(os.getenv('GROQ_REQUESTS_PER_MINUTE', '30'))
+    GROQ_TOKENS_PER_MINUTE = int(os.getenv('GROQ_TOKENS_PER_MINUTE', '30000'))
+    GROQ_COMPLETION_TOKEN_ESTIMATE = int(os.getenv('GROQ_COMPLETION_TOKEN_ESTIMATE', '500')) # Reserved per call for the response
+    GROQ_MAX_RETRIES = int(os.getenv('GROQ_MAX_RETRIES', '5')) # Retries on 429 (rate limited) responses
+
+    # Persistent cache of per-document topic scores returned by Grok AI
+    TOPIC_CACHE_PATH = os.getenv('TOPIC_CACHE_PATH', os.path.join(DATA_DIR, '.cache', 'topic_scores.sqlite3'))
+    TOPIC_CACHE_MAX_ENTRIES = int(os.getenv('TOPIC_CACHE_MAX_ENTRIES', '10000'))
+    TOPIC_CACHE_TTL_SECONDS = int(os.getenv('TOPIC_CACHE_TTL_SECONDS', '0')) or None # 0 = never expire
+
     # Groq API Key (loaded from environment variable for security)
     # Ensure you set GROQ_API_KEY in your .env file or system environment variables
     GROQ_API_KEY = os.getenv('GROQ_API_KEY', 'your_default_grok_api_key_if_not_set_in_env')
 
+    # Per-request sampling profiler: when enabled, requests with `?profile=1` or an `X-Profile: 1` header
+    # write their sampled stacks (collapsed flame graph format) to PROFILE_DIR. Leave off in production.
+    PROFILE_REQUESTS = os.getenv('PROFILE_REQUESTS', 'false').lower() in ('true', '1', 't')
+    PROFILE_INTERVAL_MS = int(os.getenv('PROFILE_INTERVAL_MS', '5')) # Time between stack samples
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(DATA_DIR, '.cache', 'profiles'))
+
     # Backend API port
     FLASK_RUN_PORT = os.getenv('FLASK_RUN_PORT', 5000)
 
@@ -0,0 +1,151 @@
+# scheduler/backend/corpus_loader.py
+
+import threading
+import time
+import traceback
+
+from corpus_store import document_hash
+from topic_cache import fingerprint
+
+# Loader states reported by CorpusLoader.status()
+STATE_IDLE = 'idle'
+STATE_LOADING = 'loading'
+STATE_READY = 'ready'
+STATE_ERROR = 'error'
+
+
+def corpus_version(documents):
+    """
+    Returns a short fingerprint of a {filepath: content} corpus, which changes whenever
+    a document is added, removed or edited.
+    """
+    return fingerprint(sorted((path, document_hash(documents, path)) for path in documents))
+
+
+class CorpusLoader:
+    """
+    Loads the PYQ/textbook corpus on a background thread so the web server can start
+    (and answer health checks) before every document has been read.
+
+    `load_fn(progress)` must return a {filepath: content} mapping (a dictionary or a CorpusStore). It receives a
+    `progress(total=None, file_path=None)` callback that sets the number of files to read
+    and marks individual files as done.
+
+    While a reload is running, the previously loaded documents keep being served and are
+    swapped for the new ones only once loading has finished.
+
+    If the initial load fails, ensure_started() retries it, waiting `retry_seconds` after the
+    first failure and twice as long after each further one (at most `max_retry_seconds`).
+    """
+
+    def __init__(self, load_fn, retry_seconds=5, max_retry_seconds=300):
+        self._load_fn = load_fn
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._failures = 0 # Consecutive failed loads
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loaded = False
+        self.documents = {}
+        self.version = None # corpus_version() of `documents`
+        self.state = STATE_IDLE
+        self.error = None
+        self.files_total = 0
+        self.files_done = 0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_ready(self):
+        """
+        True once a corpus has been loaded successfully (including while a reload is running).
+        """
+        return self._loaded
+
+    @property
+    def is_loading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts loading in the background unless a load is already running.
+        Returns True if a new load was started.
+        """
+        with self._lock:
+            if self.is_loading:
+                return False
+            self.state = STATE_LOADING
+            self.error = None
+            self.files_total = 0
+            self.files_done = 0
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='corpus-loader', daemon=True)
+            self._thread.start()
+            return True
+
+    def ensure_started(self):
+        """
+        Starts the initial load if nothing has been loaded or attempted yet, or retries it once the
+        backoff after a failed attempt has passed.
+        """
+        if self.state == STATE_IDLE:
+            self.start()
+        elif self.state == STATE_ERROR and not self.is_loading:
+            delay = min(self.retry_seconds * 2 ** (self._failures - 1), self.max_retry_seconds)
+            if time.time() - self.finished_at >= delay:
+                print(f"Retrying the document corpus load after {self._failures} failed attempt(s)...")
+                self.start()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the current load (if any) has finished. Returns True if the corpus is ready.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.is_ready
+
+    def _progress(self, total=None, file_path=None):
+        if total is not None:
+            self.files_total = total
+        if file_path is not None:
+            self.files_done += 1
+
+    def _run(self):
+        try:
+            documents = self._load_fn(self._progress)
+            version = corpus_version(documents)
+        except Exception as e:
+            print(f"Error loading document corpus: {e}")
+            traceback.print_exc()
+            with self._lock:
+                self.error = str(e)
+                self._failures += 1
+                self.state = STATE_READY if self._loaded else STATE_ERROR
+                self.finished_at = time.time()
+            return
+
+        with self._lock:
+            self.documents = documents # Atomic swap; in-flight requests keep the old mapping
+            self.version = version
+            self._loaded = True
+            self._failures = 0
+            self.state = STATE_READY
+            self.finished_at = time.time()
+        print(f"Document corpus ready: {len(documents)} documents loaded in {self.finished_at - self.started_at:.2f}s.")
+
+    def status(self):
+        """
+        Returns a JSON-serialisable summary of the loader state.
+        """
+        return {
+            'state': STATE_LOADING if self.is_loading else self.state,
+            'ready': self.is_ready,
+            'documents': len(self.documents),
+            'version': self.version,
+            'filesDone': self.files_done,
+            'filesTotal': self.files_total,
+            'error': self.error,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+        }
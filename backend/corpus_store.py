@@ -0,0 +1,241 @@
+# scheduler/backend/corpus_store.py
+
+import glob
+import json
+import mmap
+import os
+from collections.abc import Mapping
+
+from extraction_cache import file_sha256
+from topic_cache import content_hash, fingerprint
+from utils import atomic_write
+
+# Bump this whenever the on-disk layout changes, so stores written by older code are rebuilt
+STORE_FORMAT_VERSION = 2
+
+
+def store_version(document_hashes):
+    """
+    Returns the version of a corpus given {filepath: content hash}; identical to
+    corpus_loader.corpus_version() of the same documents.
+    """
+    return fingerprint(sorted(document_hashes.items()))
+
+
+def file_manifest(file_paths, previous=None):
+    """
+    Returns {filepath: {'size', 'mtime_ns', 'sha256'}} for `file_paths`. Files whose size and
+    mtime match their entry in `previous` (an earlier manifest) keep its hash instead of being re-read.
+    """
+    previous = previous or {}
+    manifest = {}
+    for path in file_paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue # Deleted since the directory was listed
+        entry = previous.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            sha256 = entry['sha256']
+        else:
+            sha256 = file_sha256(path)
+        manifest[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+    return manifest
+
+
+def diff_manifest(previous, current):
+    """
+    Compares two file manifests by content hash.
+    Returns (added, changed, removed) lists of file paths.
+    """
+    added = [path for path in current if path not in previous]
+    changed = [path for path in current if path in previous and current[path]['sha256'] != previous[path]['sha256']]
+    removed = [path for path in previous if path not in current]
+    return added, changed, removed
+
+
+def write_corpus_store(store_dir, documents, page_lengths=None, files=None, base=None):
+    """
+    Writes `documents` ({filepath: content}) to `store_dir` as one UTF-8 blob
+    (`corpus-<version>.bin`) plus `index.json` holding each document's byte offset, length,
+    content hash and page offsets. `page_lengths` ({filepath: [characters per page]}) is
+    optional; documents without it are stored as a single page.
+
+    `files` is the file_manifest() of every source file the corpus was read from (including
+    files that yielded no text), used by later rescans to find what changed.
+    A content of None copies that document unchanged from the CorpusStore `base`, byte for byte,
+    so an incremental update never decodes or re-extracts unchanged documents.
+
+    Nothing is written if the store already holds this exact corpus, so several workers can
+    call this on startup. Older blobs are removed afterwards; on POSIX, workers that still
+    have them mapped keep reading them until they reopen the store.
+    Returns the store version.
+    """
+    page_lengths = page_lengths or {}
+    hashes = {path: base.content_hash(path) if text is None else content_hash(text) for path, text in documents.items()}
+    version = store_version(hashes)
+    index_path = os.path.join(store_dir, 'index.json')
+    blob_name = f"corpus-{version}.bin"
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if (existing.get('format') == STORE_FORMAT_VERSION and existing.get('version') == version
+                and os.path.exists(os.path.join(store_dir, blob_name))):
+            if files is not None and existing.get('files') != files:
+                # Same text, but source files were touched, added without text, etc.
+                atomic_write(index_path, json.dumps({**existing, 'files': files}))
+            return version
+    except (OSError, ValueError):
+        pass
+
+    os.makedirs(store_dir, exist_ok=True)
+    entries = []
+    offset = 0
+    blob_path = os.path.join(store_dir, blob_name)
+    tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+    # Documents are streamed to disk one at a time rather than joined into one large bytes object
+    with open(tmp_path, 'wb') as f:
+        for path, text in documents.items():
+            if text is None:
+                data, pages = base.raw(path)
+                f.write(data)
+                entries.append({'path': path, 'hash': hashes[path], 'offset': offset, 'length': len(data), 'pages': pages})
+                offset += len(data)
+                continue
+            pages = []
+            page_start = 0
+            page_offset = 0
+            for length in page_lengths.get(path) or [len(text)]:
+                pages.append(page_offset)
+                page_offset += len(text[page_start:page_start + length].encode('utf-8'))
+                page_start += length
+            data = text.encode('utf-8')
+            f.write(data)
+            entries.append({'path': path, 'hash': hashes[path], 'offset': offset, 'length': len(data), 'pages': pages})
+            offset += len(data)
+    os.replace(tmp_path, blob_path)
+    atomic_write(index_path, json.dumps({'format': STORE_FORMAT_VERSION, 'version': version, 'blob': blob_name,
+                                         'documents': entries, 'files': files or {}}))
+
+    for old_blob in glob.glob(os.path.join(store_dir, 'corpus-*.bin')):
+        if os.path.basename(old_blob) != blob_name:
+            try:
+                os.remove(old_blob)
+            except OSError:
+                pass # Still mapped on a platform that forbids removal; cleaned up on a later write
+    print(f"Wrote corpus store: {len(entries)} documents, {offset / 1024 / 1024:.1f} MB in {store_dir}")
+    return version
+
+
+class CorpusStore(Mapping):
+    """
+    Read-only {filepath: content} view of a corpus written by write_corpus_store().
+
+    The blob is memory-mapped, so every worker process shares the same page-cache copy of the
+    corpus instead of holding its own Python strings. A document's text is decoded from the
+    mapping each time it is looked up and is not retained, so per-worker memory does not grow
+    with the corpus. Content hashes come from the index, so versioning the corpus never has
+    to read the text.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('format') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus store format in {store_dir}: {index.get('format')}")
+        self.version = index['version']
+        self.files = index.get('files', {}) # file_manifest() of the source files
+        self._entries = {entry['path']: entry for entry in index['documents']}
+        self._buffer = b''
+        with open(os.path.join(store_dir, index['blob']), 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                # The mapping stays valid after the file is closed (or replaced by a newer blob)
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _read(self, start, stop):
+        return str(memoryview(self._buffer)[start:stop], 'utf-8')
+
+    def __getitem__(self, path):
+        entry = self._entries[path]
+        return self._read(entry['offset'], entry['offset'] + entry['length'])
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def content_hash(self, path):
+        """
+        Returns the content hash of a document without reading its text.
+        """
+        return self._entries[path]['hash']
+
+    def page_count(self, path):
+        return len(self._entries[path]['pages'])
+
+    def page(self, path, page_num):
+        """
+        Returns the text of a single page of a document.
+        """
+        entry = self._entries[path]
+        pages = entry['pages']
+        start = entry['offset'] + pages[page_num]
+        stop = entry['offset'] + (pages[page_num + 1] if page_num + 1 < len(pages) else entry['length'])
+        return self._read(start, stop)
+
+    def raw(self, path):
+        """
+        Returns (UTF-8 bytes, page byte offsets) of a document, for copying it into a new store.
+        """
+        entry = self._entries[path]
+        return memoryview(self._buffer)[entry['offset']:entry['offset'] + entry['length']], entry['pages']
+
+    def nbytes(self):
+        """
+        Size of the mapped blob in bytes.
+        """
+        return len(self._buffer)
+
+    def update_files(self, files):
+        """
+        Records a new file manifest for the same documents (e.g. after files were touched without
+        changing their content), in `files` and in index.json, so those files are not re-hashed.
+        """
+        self.files = files
+        index_path = os.path.join(self.store_dir, 'index.json')
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get('version') == self.version and index.get('files') != files:
+            # Left alone if another worker has written a newer corpus in the meantime
+            atomic_write(index_path, json.dumps({**index, 'files': files}))
+
+
+def open_corpus_store(store_dir):
+    """
+    Opens the corpus store in `store_dir`, or returns None if there is none (or it is unreadable).
+    """
+    try:
+        return CorpusStore(store_dir)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Warning: Could not open corpus store {store_dir}, it will be rebuilt: {e}")
+        return None
+
+
+def document_hash(documents, path):
+    """
+    Returns the content hash of `documents[path]`, reading it from the store index when
+    `documents` is a CorpusStore instead of hashing the text.
+    """
+    if isinstance(documents, CorpusStore):
+        return documents.content_hash(path)
+    return content_hash(documents[path])
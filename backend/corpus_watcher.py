@@ -0,0 +1,65 @@
+# scheduler/backend/corpus_watcher.py
+
+import threading
+import time
+import traceback
+
+
+class CorpusWatcher:
+    """
+    Polls the document directories of every loaded subject and starts an incremental corpus
+    reload (see app.load_corpus) for subjects whose files were added, changed or deleted.
+
+    Checking is cheap: directories are listed and files stat()ed, and only files whose
+    size or mtime changed are re-hashed. The reload itself runs on the subject's CorpusLoader,
+    which keeps serving the previous corpus until the new one is swapped in.
+    """
+
+    def __init__(self, registry, interval_seconds):
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def check(self, subject):
+        """
+        Checks one subject and starts a reload if its files changed.
+        Returns {'added', 'changed', 'removed', 'reloading'}, or None if its corpus is not loaded yet.
+        """
+        if subject.corpus_loader.is_loading:
+            return None
+        changes = subject.pending_changes()
+        if changes is None:
+            return None
+        added, changed, removed = changes
+        reloading = False
+        if added or changed or removed:
+            print(f"Detected changes in {subject.display_name} documents: "
+                  f"{len(added)} added, {len(changed)} changed, {len(removed)} removed.")
+            reloading = subject.corpus_loader.start()
+        return {'added': added, 'changed': changed, 'removed': removed, 'reloading': reloading}
+
+    def check_all(self):
+        for subject in self.registry.loaded():
+            try:
+                self.check(subject)
+            except Exception as e:
+                print(f"Error checking {subject.name} documents for changes: {e}")
+                traceback.print_exc()
+
+    def ensure_started(self):
+        """
+        Starts the polling thread unless it is running or polling is disabled (interval 0).
+        """
+        if not self.interval_seconds:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='corpus-watcher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            self.check_all()
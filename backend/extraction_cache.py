@@ -0,0 +1,146 @@
+# scheduler/backend/extraction_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+from utils import atomic_write
+
+# Bump this whenever the way text is extracted changes, so stale cache entries are ignored.
+EXTRACTOR_VERSION = 1
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """
+    Computes the SHA-256 hex digest of a file's contents, reading it in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of text extracted from PYQ/textbook files.
+
+    Extracted text is stored once per file content hash (`texts/<sha256>.txt`).
+    A small index maps each file path to its last seen size, mtime and hash (plus the length
+    of each extracted page), so unchanged files are recognised from a single `os.stat()`
+    without re-reading them.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.texts_dir = os.path.join(cache_dir, 'texts')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self._dirty = False
+        os.makedirs(self.texts_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == EXTRACTOR_VERSION:
+                return data.get('files', {})
+            print(f"Extraction cache version changed, rebuilding: {self.index_path}")
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: Could not load extraction cache index {self.index_path}: {e}")
+        return {}
+
+    def fingerprint(self, file_path):
+        """
+        Returns the content hash of `file_path`.
+        The file is only re-hashed when its size or mtime differ from the indexed entry.
+        """
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._index.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+
+        sha256 = file_sha256(file_path)
+        with self._lock:
+            self._index[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+            self._dirty = True
+        return sha256
+
+    def _text_path(self, sha256):
+        return os.path.join(self.texts_dir, f"{sha256}.txt")
+
+    def lookup(self, file_path):
+        """
+        Returns (sha256, text): the content hash of `file_path` and its cached text, or None as the
+        text if it has not been extracted yet. Pass the hash on to put() once the file is extracted,
+        so the text is stored under the content that was actually read, even if the file changes
+        (e.g. finishes copying) in the meantime.
+        Raises OSError if the file no longer exists or cannot be read.
+        """
+        sha256 = self.fingerprint(file_path)
+        try:
+            with open(self._text_path(sha256), 'r', encoding='utf-8') as f:
+                return sha256, f.read()
+        except FileNotFoundError:
+            return sha256, None
+
+    def get_page_lengths(self, file_path):
+        """
+        Returns the number of characters of each page of the cached text for `file_path`, if known.
+        """
+        with self._lock:
+            entry = self._index.get(os.path.abspath(file_path))
+        return entry.get('pages') if entry else None
+
+    def put(self, file_path, sha256, text, page_lengths=None):
+        """
+        Stores the text extracted from `file_path`, whose content hash was `sha256` (from lookup())
+        when extraction started, and optionally the length of each of its pages.
+        """
+        atomic_write(self._text_path(sha256), text)
+        if page_lengths is not None:
+            with self._lock:
+                entry = self._index.get(os.path.abspath(file_path))
+                if entry and entry['sha256'] == sha256: # Not re-hashed since
+                    entry['pages'] = page_lengths
+                    self._dirty = True
+
+    def prune(self):
+        """
+        Drops index entries for files that no longer exist and deletes cached
+        texts that are not referenced by any remaining entry.
+        """
+        with self._lock:
+            for key in list(self._index):
+                if not os.path.exists(key):
+                    del self._index[key]
+                    self._dirty = True
+            live_hashes = {entry['sha256'] for entry in self._index.values()}
+
+        for filename in os.listdir(self.texts_dir):
+            sha256, ext = os.path.splitext(filename)
+            if ext == '.txt' and sha256 not in live_hashes:
+                try:
+                    os.remove(os.path.join(self.texts_dir, filename))
+                except OSError:
+                    pass
+
+    def save(self):
+        """
+        Persists the path index if it changed since it was loaded.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({'version': EXTRACTOR_VERSION, 'files': self._index})
+            self._dirty = False
+        try:
+            atomic_write(self.index_path, payload)
+        except OSError as e:
+            print(f"Warning: Could not save extraction cache index {self.index_path}: {e}")
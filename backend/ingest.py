@@ -0,0 +1,178 @@
+# scheduler/backend/ingest.py
+
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from metrics import CACHE_LOOKUPS, SPAN_SECONDS
+from utils import count_pdf_pages, extract_pages_from_pdf, read_text_file
+
+
+def _extract_pdf_task(pdf_path, start, stop):
+    """
+    Worker entry point: extracts pages [start, stop) of a PDF.
+    Runs in a separate process, so it only depends on utils.py.
+    Returns (page texts, seconds spent).
+    """
+    started = time.perf_counter()
+    pages = extract_pages_from_pdf(pdf_path, start, stop)
+    return pages, time.perf_counter() - started
+
+
+def _plan_pdf_tasks(pdf_path, split_bytes, pages_per_task):
+    """
+    Returns the list of (start, stop) page ranges to extract for `pdf_path`.
+    Small files are extracted as a single task; large textbooks are split into page ranges
+    so their pages are spread across workers.
+    """
+    if os.path.getsize(pdf_path) < split_bytes:
+        return [(0, None)]
+    num_pages = count_pdf_pages(pdf_path)
+    if num_pages <= pages_per_task:
+        return [(0, None)]
+    return [(start, min(start + pages_per_task, num_pages)) for start in range(0, num_pages, pages_per_task)]
+
+
+def ingest_documents(file_paths, cache=None, max_workers=None, split_bytes=20 * 1024 * 1024, pages_per_task=50, progress=None, page_lengths=None):
+    """
+    Reads the text of all .txt and .pdf files in `file_paths`.
+
+    PDFs that are not in `cache` are extracted in a process pool, one task per file
+    (or per page range for very large files). Each task's page texts are joined once,
+    and page ranges are stitched back together in order.
+    `progress`, if given, is called with each file path once that file has been handled.
+    `page_lengths`, if given, is filled with {filepath: [characters per page]} for every
+    document read (a text file counts as a single page).
+    Returns a dictionary mapping file paths to their content, in the order of `file_paths`.
+    """
+    texts = {}
+    timings = {}
+    pending_pdfs = []
+    hashes = {} # Content hash of each pending PDF when it was looked up, to cache its text under
+
+    for file_path in file_paths:
+        filename = os.path.basename(file_path)
+        if filename.endswith('.txt'):
+            started = time.perf_counter()
+            text = read_text_file(file_path)
+            timings[file_path] = time.perf_counter() - started
+            if text:
+                texts[file_path] = text
+                if page_lengths is not None:
+                    page_lengths[file_path] = [len(text)]
+                print(f"  - Read: {filename} (TXT, {timings[file_path]:.2f}s)")
+            else:
+                print(f"  - Skipped: {filename} (TXT - empty or error)")
+            if progress:
+                progress(file_path)
+        elif filename.endswith('.pdf'):
+            cached_text = None
+            if cache:
+                try:
+                    hashes[file_path], cached_text = cache.lookup(file_path)
+                except OSError as e:
+                    print(f"  - Skipped: {filename} (PDF - could not be read: {e})")
+                    if progress:
+                        progress(file_path)
+                    continue
+                CACHE_LOOKUPS.inc(cache='extraction', result='miss' if cached_text is None else 'hit')
+            if cached_text is None:
+                pending_pdfs.append(file_path)
+                continue
+            if cached_text:
+                texts[file_path] = cached_text
+                if page_lengths is not None:
+                    page_lengths[file_path] = cache.get_page_lengths(file_path) or [len(cached_text)]
+                print(f"  - Read: {filename} (PDF, cached)")
+            else:
+                print(f"  - Skipped: {filename} (PDF - no text extracted, cached)")
+            if progress:
+                progress(file_path)
+        else:
+            print(f"  - Skipped: {filename} (Unsupported format)")
+            if progress:
+                progress(file_path)
+
+    if pending_pdfs:
+        failed = set()
+        extracted = _extract_pdfs(pending_pdfs, timings, max_workers, split_bytes, pages_per_task, progress, failed)
+        for file_path in pending_pdfs:
+            filename = os.path.basename(file_path)
+            pages = extracted[file_path]
+            text = ''.join(pages)
+            # Extraction runs in worker processes; its time is recorded here from the task timings
+            SPAN_SECONDS.observe(timings.get(file_path, 0.0), span='pdf_extract')
+            if not os.path.exists(file_path):
+                print(f"  - Skipped: {filename} (PDF - deleted while it was being extracted)")
+                continue
+            if file_path in failed:
+                # Text is missing pages: use it for now, but extract the file again next time
+                print(f"  - Not caching {filename}: some of its pages could not be extracted.")
+            elif cache:
+                cache.put(file_path, hashes[file_path], text, [len(page) for page in pages])
+            if text:
+                texts[file_path] = text
+                if page_lengths is not None:
+                    page_lengths[file_path] = [len(page) for page in pages]
+                print(f"  - Read: {filename} (PDF, {timings[file_path]:.2f}s)")
+            else:
+                print(f"  - Skipped: {filename} (PDF - no text extracted or error)")
+
+    # Keep the caller's file order regardless of which worker finished first
+    return {path: texts[path] for path in file_paths if path in texts}
+
+
+def _extract_pdfs(pdf_paths, timings, max_workers, split_bytes, pages_per_task, progress=None, failed=None):
+    """
+    Extracts every PDF in `pdf_paths`, recording per-file worker time in `timings`
+    and calling `progress` with each path once all of its page ranges are done.
+    Files with a failed task (the worker raised, or a page range came back with fewer pages
+    than it holds) are added to `failed`, if given.
+    Returns a dictionary mapping file paths to the list of their page texts.
+    """
+    tasks = [(path, start, stop) for path in pdf_paths for start, stop in _plan_pdf_tasks(path, split_bytes, pages_per_task)]
+    parts = {path: {} for path in pdf_paths}
+    remaining = Counter(path for path, _, _ in tasks)
+
+    def check_range(path, start, stop, pages):
+        # Whole-file tasks may legitimately return no pages (unreadable PDFs are cached as empty)
+        if stop is not None and len(pages) != stop - start:
+            print(f"  - Error extracting {os.path.basename(path)} (pages {start}-{stop - 1}): got {len(pages)} of {stop - start} pages")
+            if failed is not None:
+                failed.add(path)
+
+    def task_done(path):
+        remaining[path] -= 1
+        if remaining[path] == 0 and progress:
+            progress(path)
+
+    wall_started = time.perf_counter()
+
+    if max_workers == 1 or len(tasks) == 1:
+        # Not worth starting a pool for a single task
+        for path, start, stop in tasks:
+            parts[path][start], elapsed = _extract_pdf_task(path, start, stop)
+            check_range(path, start, stop, parts[path][start])
+            timings[path] = timings.get(path, 0.0) + elapsed
+            task_done(path)
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+        print(f"  Extracting {len(pdf_paths)} PDF(s) as {len(tasks)} task(s) on {workers} worker process(es)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_extract_pdf_task, path, start, stop): (path, start, stop) for path, start, stop in tasks}
+            for future in as_completed(futures):
+                path, start, stop = futures[future]
+                try:
+                    parts[path][start], elapsed = future.result()
+                    check_range(path, start, stop, parts[path][start])
+                except Exception as e:
+                    print(f"  - Error extracting {os.path.basename(path)} (pages from {start}): {e}")
+                    parts[path][start], elapsed = [], 0.0
+                    if failed is not None:
+                        failed.add(path)
+                timings[path] = timings.get(path, 0.0) + elapsed
+                task_done(path)
+
+    print(f"  Extracted {len(pdf_paths)} PDF(s) in {time.perf_counter() - wall_started:.2f}s wall time.")
+    return {path: [page for _, part in sorted(path_parts.items()) for page in part] for path, path_parts in parts.items()}
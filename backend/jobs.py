@@ -0,0 +1,177 @@
+# scheduler/backend/jobs.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import sqlite_connection
+
+# Job states, in lifecycle order
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """
+    Raised by JobQueue.submit() when too many jobs are already waiting or running.
+    """
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Background job queue backed by a local thread pool, with job state persisted in SQLite
+    so any web worker can report on any job.
+
+    Jobs with the same `key` share one computation while one of them is queued or running:
+    submitting a duplicate returns the existing job. At most `max_pending` jobs may be queued
+    or running in this process; beyond that `submit()` raises QueueFullError.
+    """
+
+    def __init__(self, db_path, run_fn, max_workers=2, max_pending=32, retention_seconds=24 * 3600):
+        self.db_path = db_path
+        self.run_fn = run_fn
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='schedule-job')
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> job id, for jobs queued or running in this process
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner_pid INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key_status ON jobs (key, status)")
+        self._fail_orphaned_jobs()
+
+    def _connect(self):
+        return sqlite_connection(self.db_path, row_factory=sqlite3.Row)
+
+    def _fail_orphaned_jobs(self):
+        """
+        Marks jobs left queued/running by a process that no longer exists as failed,
+        so clients polling them get an answer instead of waiting forever.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)", (STATUS_QUEUED, STATUS_RUNNING)).fetchall()
+            orphaned = [row['id'] for row in rows if not _pid_alive(row['owner_pid'])]
+            for job_id in orphaned:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (STATUS_FAILED, 'Interrupted by a server restart. Please submit again.', time.time(), job_id),
+                )
+        if orphaned:
+            print(f"Marked {len(orphaned)} interrupted job(s) as failed.")
+
+    def submit(self, key, params):
+        """
+        Queues a job for `params` unless an identical job (same `key`) is already in flight.
+        Returns (job, created) where `job` is the job's status dictionary.
+        """
+        with self._lock:
+            existing_id = self._in_flight.get(key) or self._find_in_flight(key)
+            if existing_id:
+                return self.get(existing_id), False
+            if len(self._in_flight) >= self.max_pending:
+                raise QueueFullError(f"{len(self._in_flight)} jobs are already queued or running.")
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, key, status, params, owner_pid, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, key, STATUS_QUEUED, json.dumps(params), os.getpid(), now),
+                )
+                if self.retention_seconds:
+                    conn.execute(
+                        "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                        (STATUS_SUCCEEDED, STATUS_FAILED, now - self.retention_seconds),
+                    )
+            self._in_flight[key] = job_id
+        self._executor.submit(self._run, job_id, key, params)
+        return self.get(job_id), True
+
+    def _find_in_flight(self, key):
+        # Identical jobs queued by another web worker are shared too
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (key, STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchone()
+        return row['id'] if row else None
+
+    def _run(self, job_id, key, params):
+        try:
+            try:
+                with self._connect() as conn:
+                    conn.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (STATUS_RUNNING, time.time(), job_id))
+                result = self.run_fn(params)
+                update = (STATUS_SUCCEEDED, json.dumps(result), None)
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                traceback.print_exc()
+                update = (STATUS_FAILED, None, str(e))
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (*update, time.time(), job_id),
+                )
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get(self, job_id):
+        """
+        Returns a JSON-serialisable status dictionary for `job_id`, or None if it is unknown.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'jobId': row['id'],
+            'status': row['status'],
+            'params': json.loads(row['params']),
+            'createdAt': row['created_at'],
+            'startedAt': row['started_at'],
+            'finishedAt': row['finished_at'],
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {'inFlight': len(self._in_flight), 'maxPending': self.max_pending}
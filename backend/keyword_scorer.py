@@ -0,0 +1,138 @@
+# scheduler/backend/keyword_scorer.py
+
+import re
+from collections import Counter, defaultdict
+
+from utils import preprocess_text
+
+# Curriculum fragments too generic to identify a topic on their own
+GENERIC_FRAGMENTS = {
+    'types', 'agencies', 'examples', 'problems', 'strategies', 'structure', 'function', 'levels',
+    'experiments', 'growth', 'primary', 'secondary', 'innate', 'acquired', 'active', 'passive',
+    'humans', 'birds', 'seed', 'fruit', 'embryo', 'amplification', 'insertion', 'expression',
+    'replication', 'variation', 'enzymes', 'genetic', 'species', 'ecological',
+}
+
+# Separators used to break a curriculum entry into smaller keyword phrases
+FRAGMENT_SPLIT_RE = re.compile(r'[:,()]|\be\.g\.|\band\b', re.IGNORECASE)
+
+# Minimum length of a normalized keyword (keeps acronyms such as "mtp" and "art")
+MIN_KEYWORD_LENGTH = 3
+
+# Highest per-document score, matching the 1-5 scale used by Grok AI scoring
+MAX_SCORE = 5
+
+
+def normalize_phrase(phrase):
+    """
+    Normalizes a curriculum phrase exactly like document text (see utils.preprocess_text),
+    with runs of whitespace collapsed to single spaces.
+    """
+    return ' '.join(preprocess_text(phrase).split())
+
+
+def topic_keywords(topic):
+    """
+    Returns the set of normalized keyword phrases that identify `topic`:
+    the full topic name plus its more specific fragments,
+    e.g. "Special Modes: Apomixis, Parthenocarpy, Polyembryony" -> {"special modes apomixis ...", "apomixis", ...}.
+    """
+    keywords = {normalize_phrase(topic)}
+    for fragment in FRAGMENT_SPLIT_RE.split(topic):
+        keyword = normalize_phrase(fragment)
+        if len(keyword) >= MIN_KEYWORD_LENGTH and keyword not in GENERIC_FRAGMENTS:
+            keywords.add(keyword)
+    keywords.discard('')
+    return keywords
+
+
+def _trie_pattern(node):
+    """
+    Turns a character trie (nested dicts, '' marks the end of a word) into a regex
+    alternation that shares common prefixes, e.g. {"cat", "car"} -> "ca(?:t|r)".
+    Spaces match any run of whitespace, so phrases broken across lines in a PDF still match.
+    """
+    branches = []
+    optional = '' in node
+    for char in sorted(key for key in node if key):
+        branches.append((r'\s+' if char == ' ' else re.escape(char)) + _trie_pattern(node[char]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if optional else pattern
+
+
+def build_keyword_regex(keywords):
+    """
+    Compiles a single regex that matches any of `keywords` as whole words.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return re.compile(r'\b' + _trie_pattern(trie) + r'\b')
+
+
+class KeywordScorer:
+    """
+    Offline topic scorer built once from the curriculum.
+
+    All keywords of all topics are compiled into one prefix-sharing regex, so a document is
+    scanned a single time regardless of how many topics the curriculum has.
+    """
+
+    def __init__(self, curriculum):
+        """
+        `curriculum` maps chapter names to lists of subtopics (the 'biology' section of
+        biology_curriculum.json).
+        """
+        self.topics = [subtopic for chapter_topics in curriculum.values() for subtopic in chapter_topics]
+        self.keyword_topics = defaultdict(set) # keyword -> topics it identifies
+        for topic in self.topics:
+            for keyword in topic_keywords(topic):
+                self.keyword_topics[keyword].add(topic)
+        self.pattern = build_keyword_regex(self.keyword_topics) if self.keyword_topics else None
+
+    def count_keywords(self, text):
+        """
+        Returns a Counter of hits per (normalized) keyword in `text`, found in one pass.
+        """
+        if not self.pattern:
+            return Counter()
+        return Counter(' '.join(match.group().split()) for match in self.pattern.finditer(preprocess_text(text)))
+
+    def count_topics(self, text):
+        """
+        Returns a Counter of keyword hits per topic in `text`.
+        """
+        counts = Counter()
+        for keyword, hits in self.count_keywords(text).items():
+            for topic in self.keyword_topics.get(keyword, ()):
+                counts[topic] += hits
+        return counts
+
+    def score_text(self, text):
+        """
+        Scores the topics found in `text` from 1 to 5 by hit frequency, relative to the
+        most frequent topic in the same text.
+        Returns a list of (topic, score) pairs.
+        """
+        counts = self.count_topics(text)
+        if not counts:
+            return []
+        most_hits = max(counts.values())
+        return [(topic, 1 + round((MAX_SCORE - 1) * hits / most_hits)) for topic, hits in counts.most_common()]
+
+    def score_documents(self, document_contents):
+        """
+        Scores every document and aggregates the scores across documents.
+        Returns a Counter of {topic: aggregated score}.
+        """
+        topic_weights = Counter()
+        for doc_content in document_contents.values():
+            topic_weights.update(dict(self.score_text(doc_content)))
+        return topic_weights
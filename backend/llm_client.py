@@ -0,0 +1,105 @@
+# scheduler/backend/llm_client.py
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+
+from groq import APIConnectionError, APITimeoutError, ConflictError, Groq, InternalServerError, RateLimitError
+
+from rate_limit import RateLimiter, call_with_backoff, estimate_tokens
+
+# Errors worth another attempt: the ones the Groq SDK would retry itself (429, 409, 5xx, connection errors and timeouts)
+GROQ_RETRYABLE_ERRORS = (RateLimitError, ConflictError, InternalServerError, APIConnectionError, APITimeoutError)
+
+
+class LLMClient(ABC):
+    """
+    Interface of the language model backends used for topic scoring and schedule generation.
+    `model` identifies the backend and model; it is part of every cache key derived from its
+    responses, so results of different backends are never mixed up.
+    """
+
+    model = None
+
+    @abstractmethod
+    def complete(self, prompt):
+        """
+        Sends a single-message prompt that asks for JSON output and returns the response text.
+        Raises on failure; callers fall back to offline scoring/scheduling.
+        """
+
+
+class GroqLLMClient(LLMClient):
+    """
+    Grok AI via the Groq API.
+    Waits for rate-limit capacity before each attempt (the limiter is shared by all threads
+    using this client) and retries with jittered exponential backoff when Groq answers 429 or
+    fails transiently (5xx, connection errors, timeouts).
+    """
+
+    def __init__(self, api_key, model, requests_per_minute, tokens_per_minute, completion_token_estimate=500, max_retries=5):
+        # The SDK's own retries would bypass the rate limiter; call_with_backoff does all retrying
+        self.client = Groq(api_key=api_key, max_retries=0)
+        self.model = model
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.completion_token_estimate = completion_token_estimate
+        self.max_retries = max_retries
+
+    def complete(self, prompt):
+        def call():
+            self.rate_limiter.acquire(estimate_tokens(prompt) + self.completion_token_estimate)
+            return self.client.chat.completions.create(
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                model=self.model,
+                response_format={"type": "json_object"} # Request JSON output
+            )
+        chat_completion = call_with_backoff(call, GROQ_RETRYABLE_ERRORS, max_retries=self.max_retries)
+        return chat_completion.choices[0].message.content
+
+
+class FakeLLMClient(LLMClient):
+    """
+    Local stand-in for benchmarks and offline development: no network, canned JSON responses
+    after `latency_seconds`.
+
+    Schedule prompts (those mentioning a "study schedule") get a one-day schedule.
+    Topic prompts get `topics_per_response` of those `topics` that the prompt's "List of ...
+    topics:" line offers (so several subjects can share one client), picked and scored
+    deterministically from the prompt text, so repeated runs give the same results. Without
+    matching `topics` the response is an empty list.
+    """
+
+    model = 'fake'
+
+    def __init__(self, latency_seconds=0.0, topics=(), topics_per_response=5):
+        self.latency_seconds = latency_seconds
+        self.topics = list(topics)
+        self.topics_per_response = topics_per_response
+        self.calls = 0
+
+    def complete(self, prompt):
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if 'study schedule' in prompt:
+            return json.dumps([{"day": 1, "topics": ["Review & Practice PYQs"]}])
+        topics = self._offered_topics(prompt)
+        if not topics:
+            return json.dumps([])
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        picks = []
+        for i in range(min(self.topics_per_response, len(topics))):
+            topic = topics[(seed + i * 7919) % len(topics)]
+            picks.append({"topic": topic, "score": 1 + (seed >> i) % 5})
+        return json.dumps(picks)
+
+    def _offered_topics(self, prompt):
+        # Topic names contain commas themselves, so the list is matched against the known topics rather than split
+        for line in prompt.splitlines():
+            if line.strip().startswith('List of ') and ' topics: ' in line:
+                offered = line.split(' topics: ', 1)[1]
+                return [topic for topic in self.topics if topic in offered]
+        return self.topics
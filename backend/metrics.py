@@ -0,0 +1,158 @@
+# scheduler/backend/metrics.py
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+
+# Latency buckets in seconds, from fast cache hits up to slow LLM-backed requests
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels, e.g. `LLM_ERRORS.inc(purpose='topics')`.
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with optional labels, e.g. `REQUEST_SECONDS.observe(0.2, endpoint='...')`.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {} # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', repr(float(bound)))])} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+# --- Metrics of the schedule pipeline ---
+SPAN_SECONDS = Histogram('scheduler_span_seconds', 'Time spent in each step of the schedule pipeline.', ['span'])
+REQUEST_SECONDS = Histogram('scheduler_http_request_seconds', 'HTTP request latency by endpoint (streaming endpoints: until the response starts).',
+                            ['endpoint', 'method', 'status'])
+CACHE_LOOKUPS = Counter('scheduler_cache_lookups_total', 'Cache lookups by cache and result (hit or miss).', ['cache', 'result'])
+FALLBACKS = Counter('scheduler_fallbacks_total', 'Times an offline fallback replaced an LLM result.', ['kind'])
+LLM_ERRORS = Counter('scheduler_llm_errors_total', 'Failed LLM calls and unusable LLM responses.', ['purpose', 'reason'])
+LLM_TOKENS_SENT = Counter('scheduler_llm_prompt_tokens_total', 'Estimated prompt tokens sent to the LLM.', ['purpose'])
+
+ALL_METRICS = (SPAN_SECONDS, REQUEST_SECONDS, CACHE_LOOKUPS, FALLBACKS, LLM_ERRORS, LLM_TOKENS_SENT)
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    Times the enclosed block and records it in scheduler_span_seconds{span=name}.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - started, span=name)
+
+
+def render_metrics():
+    """
+    Returns all metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler for a single request: a background thread records the
+    stack of every other thread every `interval_seconds` (this includes the worker threads the
+    request fans out to, and any concurrent requests). `stop()` returns the samples as
+    collapsed stacks ("thread;outer;...;inner count" per line), the input format of flame
+    graph tools such as flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval_seconds=0.005):
+        self.interval_seconds = interval_seconds
+        self.samples = _Tally()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[';'.join([names.get(thread_id, str(thread_id))] + stack[::-1])] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common()) + '\n'
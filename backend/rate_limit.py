@@ -0,0 +1,95 @@
+# scheduler/backend/rate_limit.py
+
+import random
+import threading
+import time
+
+
+# Rough average for English text with the Llama tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for rate limiting and chunking (about 4 characters per token for English text).
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that refills continuously at `rate_per_minute`.
+    `acquire()` blocks until enough tokens are available.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def acquire(self, amount=1):
+        # A single request larger than the whole bucket would otherwise wait forever
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_seconds = (amount - self.tokens) / self.refill_per_second
+            time.sleep(wait_seconds)
+
+
+class RateLimiter:
+    """
+    Combines a requests-per-minute and a tokens-per-minute bucket, matching how Groq
+    enforces its quotas. A limit of 0 (or None) disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, estimated_tokens=1):
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens:
+            self.tokens.acquire(estimated_tokens)
+
+
+def _retry_after_seconds(error):
+    """
+    Returns the server-suggested delay from a Retry-After header, if the error carries one.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_backoff(fn, retry_on, max_retries=5, base_delay=1.0, max_delay=60.0):
+    """
+    Calls `fn()` and retries it when it raises one of the `retry_on` exception types,
+    sleeping with exponential backoff and full jitter between attempts
+    (or for the Retry-After delay, when the server sends one).
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except retry_on as e:
+            if attempt == max_retries:
+                raise
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            print(f"  - Call failed ({e.__class__.__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            time.sleep(delay)
@@ -0,0 +1,154 @@
+# scheduler/backend/scheduler.py
+
+# Label used for days (or leftover time) that have no specific topic assigned
+REVIEW_LABEL = "Review & Practice PYQs"
+
+# Shortest study or revision session worth scheduling, in minutes
+MIN_SESSION_MINUTES = 15
+
+# Share of the total study capacity that first-fit packing is expected to fill
+PACKING_SLACK = 0.9
+
+# Days after the first study session at which a topic is revised (spaced repetition)
+DEFAULT_REVISION_INTERVALS = (1, 3, 7, 14, 30)
+
+
+def revision_rounds(target_score):
+    """
+    Returns how many spaced revisions each topic gets: 1 below 60%, up to 4 for a 90%+ target.
+    """
+    return 1 + sum(target_score >= threshold for threshold in (60, 80, 90))
+
+
+class _Calendar:
+    """
+    Per-day time budgets for the greedy scheduler.
+    Study sessions may only use `study_minutes` of a day, so revision sessions always have room.
+    """
+
+    def __init__(self, days, minutes_per_day, study_minutes):
+        self.remaining = [minutes_per_day] * days
+        self.study_left = [study_minutes] * days
+        self.entries = [[] for _ in range(days)]
+        self._first_study_day = 0 # Every earlier day is already full of study sessions
+
+    def place(self, label, minutes, earliest=0, study=False):
+        """
+        Puts a session on the first day >= `earliest` that has room for it.
+        Returns the day index, or None if no day has room.
+        """
+        if study:
+            while (self._first_study_day < len(self.remaining)
+                   and min(self.remaining[self._first_study_day], self.study_left[self._first_study_day]) < MIN_SESSION_MINUTES):
+                self._first_study_day += 1
+            earliest = max(earliest, self._first_study_day)
+        for day in range(earliest, len(self.remaining)):
+            if self.remaining[day] < minutes or (study and self.study_left[day] < minutes):
+                continue
+            self.remaining[day] -= minutes
+            if study:
+                self.study_left[day] -= minutes
+            self.entries[day].append(label)
+            return day
+        return None
+
+
+def _compress_study_minutes(study_minutes, capacity):
+    """
+    Scales the study time above MIN_SESSION_MINUTES down so the total fits in `capacity` minutes.
+    Only the part above the floor shrinks, so the floor can never push the total back over
+    `capacity` unless even MIN_SESSION_MINUTES per topic does not fit.
+    """
+    floor_total = MIN_SESSION_MINUTES * len(study_minutes)
+    extra_total = sum(study_minutes.values()) - floor_total
+    if extra_total <= 0 or floor_total + extra_total <= capacity:
+        return dict(study_minutes)
+    scale = max(0.0, capacity - floor_total) / extra_total
+    return {topic: MIN_SESSION_MINUTES + int((minutes - MIN_SESSION_MINUTES) * scale) for topic, minutes in study_minutes.items()}
+
+
+def _place_study_sessions(topics, study_minutes, days, minutes_per_day, study_cap):
+    """
+    First-fit places every topic's study session, highest weight first.
+    Returns (calendar, {topic: day index}, [topics that did not fit]).
+    """
+    calendar = _Calendar(days, minutes_per_day, study_cap)
+    study_day = {}
+    skipped = []
+    for topic, _ in topics:
+        day = calendar.place(topic, study_minutes[topic], study=True)
+        if day is None:
+            skipped.append(topic)
+        else:
+            study_day[topic] = day
+    return calendar, study_day, skipped
+
+
+def build_schedule(weighted_topics, days, target_score, minutes_per_day=240, base_topic_minutes=60,
+                   revision_intervals=DEFAULT_REVISION_INTERVALS, study_share=0.75, unplaced=None):
+    """
+    Builds a deterministic study schedule from weighted topics, without calling Grok AI.
+
+    1. Each topic gets study time proportional to its weight (relative to the mean weight).
+       If everything would not fit in `days` x `minutes_per_day`, the time above
+       MIN_SESSION_MINUTES is scaled down until all topics can be placed.
+    2. Topics are placed highest weight first, each on the earliest day with room
+       (first-fit bin packing), using at most `study_share` of each day. Topics are only
+       left out when even MIN_SESSION_MINUTES each does not fit; the lowest-weight ones go first.
+    3. Every placed topic gets spaced revision sessions `revision_intervals` days later;
+       higher target scores get more revision rounds.
+    4. Days left empty are filled with PYQ practice, cycling through topics by weight.
+
+    Args:
+        weighted_topics (list): (topic, weight) pairs.
+        days (int): Number of preparation days.
+        target_score (int): Target score in percent.
+        minutes_per_day (int): Study time available per day.
+        base_topic_minutes (int): Study time for a topic of average weight.
+        unplaced (list): If given, filled with the topics that did not fit, lowest weight last.
+    Returns:
+        list: [{"day": int, "topics": [str, ...]}, ...] for days 1..`days`.
+    """
+    days = int(days)
+    topics = sorted(((topic, float(weight)) for topic, weight in weighted_topics if weight > 0),
+                    key=lambda item: (-item[1], item[0])) # Highest weight first, ties by name for reproducibility
+    if not topics:
+        return [{"day": d, "topics": [REVIEW_LABEL]} for d in range(1, days + 1)]
+
+    study_cap = max(MIN_SESSION_MINUTES, int(minutes_per_day * study_share))
+    mean_weight = sum(weight for _, weight in topics) / len(topics)
+    study_minutes = {topic: min(study_cap, max(MIN_SESSION_MINUTES, round(base_topic_minutes * weight / mean_weight)))
+                     for topic, weight in topics}
+
+    # Compress study time if the whole curriculum would not fit otherwise (keeping some slack,
+    # since first-fit packing leaves small gaps at the end of days). If packing still leaves
+    # topics out, compress further until everything fits or every session is at the floor.
+    capacity = days * study_cap * PACKING_SLACK
+    full_minutes = study_minutes
+    while True:
+        study_minutes = _compress_study_minutes(full_minutes, capacity)
+        calendar, study_day, skipped = _place_study_sessions(topics, study_minutes, days, minutes_per_day, study_cap)
+        if not skipped or all(minutes == MIN_SESSION_MINUTES for minutes in study_minutes.values()):
+            break
+        capacity *= PACKING_SLACK
+    if unplaced is not None:
+        unplaced.extend(skipped)
+
+    intervals = list(revision_intervals)[:revision_rounds(target_score)]
+    for topic, _ in topics:
+        if topic not in study_day:
+            continue
+        revision_minutes = max(MIN_SESSION_MINUTES, study_minutes[topic] // 3)
+        for interval in intervals:
+            if study_day[topic] + interval >= days:
+                break
+            calendar.place(f"{topic} (Revision)", revision_minutes, earliest=study_day[topic] + interval)
+
+    schedule = []
+    practice_idx = 0
+    for day_idx, entries in enumerate(calendar.entries):
+        if not entries:
+            entries = [f"{REVIEW_LABEL}: {topics[practice_idx % len(topics)][0]}"]
+            practice_idx += 1
+        schedule.append({"day": day_idx + 1, "topics": list(dict.fromkeys(entries))})
+    return schedule
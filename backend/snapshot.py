@@ -0,0 +1,119 @@
+# scheduler/backend/snapshot.py
+
+import hashlib
+import io
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from utils import atomic_write
+
+# Bump when the snapshot layout changes; snapshots of other versions are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def snapshot_path(snapshot_dir, subject_name):
+    return os.path.join(snapshot_dir, f"{subject_name}.npz")
+
+
+def provenance_hash(metadata, weights):
+    """
+    Returns the sha256 identifying a snapshot: what it was built from (subject, scoring mode,
+    curriculum, corpus, prompt and model versions) and the weights themselves.
+    """
+    digest = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode('utf-8'))
+    digest.update(str(weights.dtype).encode('utf-8'))
+    digest.update(weights.tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(path, topics, topic_weights, metadata):
+    """
+    Writes the topic weights of one subject to `path`.
+
+    Weights of curriculum topics are stored as a single array indexed by topic ID, i.e. the
+    position of the topic in the subject's flattened curriculum; it is only valid for the
+    curriculum version recorded in `metadata['curriculumVersion']`. Other topics (names the
+    LLM returned that are not in the curriculum, which live scoring keeps as well) are stored
+    by name in `metadata['extraTopics']`, so serving the snapshot gives the same weights.
+    Returns the metadata written, including the format version and provenance hash.
+    """
+    weights = np.array([topic_weights.get(topic, 0) for topic in topics])
+    known = set(topics)
+    extra_topics = {topic: weight for topic, weight in sorted(topic_weights.items()) if topic not in known and weight > 0}
+    metadata = {**metadata, 'format': SNAPSHOT_FORMAT_VERSION, 'topics': len(topics), 'extraTopics': extra_topics}
+    metadata['provenance'] = provenance_hash(metadata, weights)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, weights=weights, metadata=np.array(json.dumps(metadata)))
+    atomic_write(path, buffer.getvalue(), mode='wb')
+    return metadata
+
+
+class TopicWeightSnapshot:
+    """
+    Precomputed topic weights of one subject, built offline by build_snapshot.py.
+    """
+
+    def __init__(self, path, metadata, weights, topics):
+        self.path = path
+        self.metadata = metadata
+        self.weights = weights
+        self.scoring_mode = metadata['scoringMode']
+        self.provenance = metadata['provenance']
+        # Built once at load time; requests only read it
+        self._topic_weights = Counter({topic: weight.item() for topic, weight in zip(topics, weights) if weight > 0})
+        self._topic_weights.update(metadata.get('extraTopics', {}))
+
+    def topic_weights(self):
+        """
+        Returns the {topic: weight} Counter of all topics with a positive weight. Do not modify it.
+        """
+        return self._topic_weights
+
+    def summary(self):
+        return {
+            'scoringMode': self.scoring_mode,
+            'provenance': self.provenance,
+            'curriculumVersion': self.metadata.get('curriculumVersion'),
+            'corpusVersion': self.metadata.get('corpusVersion'),
+            'documents': self.metadata.get('documents'),
+            'model': self.metadata.get('model'),
+            'promptVersion': self.metadata.get('promptVersion'),
+            'createdAt': self.metadata.get('createdAt'),
+        }
+
+
+def load_snapshot(path, topics, curriculum_version, expected=None):
+    """
+    Loads the snapshot at `path` for a subject whose flattened curriculum is `topics`.
+    Returns None if there is no snapshot, or if it cannot be used (unreadable, another format
+    version, or built for a different curriculum, which would make its topic IDs meaningless).
+    `expected`, if given, maps metadata keys (e.g. 'model', 'promptVersion') to the values the
+    server currently uses; a snapshot recording other values is still served, with a warning.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            weights = data['weights']
+            metadata = json.loads(data['metadata'].item())
+    except Exception as e:
+        print(f"Warning: Could not read topic-weight snapshot {path}: {e}")
+        return None
+    if metadata.get('format') != SNAPSHOT_FORMAT_VERSION:
+        print(f"Warning: Ignoring topic-weight snapshot {path}: format {metadata.get('format')}, expected {SNAPSHOT_FORMAT_VERSION}.")
+        return None
+    if metadata.get('curriculumVersion') != curriculum_version or len(weights) != len(topics):
+        print(f"Warning: Ignoring topic-weight snapshot {path}: it was built for a different curriculum. Rebuild it with build_snapshot.py.")
+        return None
+    snapshot = TopicWeightSnapshot(path, metadata, weights, topics)
+    print(f"Loaded {snapshot.scoring_mode} topic-weight snapshot {snapshot.provenance[:12]} from {path}.")
+    for key, value in (expected or {}).items():
+        if key in metadata and metadata[key] != value:
+            print(f"Warning: Topic-weight snapshot {path} was built with {key} {metadata[key]!r}, but the server uses {value!r}. "
+                  f"Rebuild it with build_snapshot.py.")
+    return snapshot
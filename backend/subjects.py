@@ -0,0 +1,250 @@
+# scheduler/backend/subjects.py
+
+import glob
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from corpus_loader import CorpusLoader
+from corpus_store import CorpusStore, diff_manifest, file_manifest
+from keyword_scorer import KeywordScorer
+from snapshot import load_snapshot, snapshot_path
+from tfidf_index import TfidfTopicIndex
+from topic_cache import fingerprint
+
+CURRICULUM_SUFFIX = '_curriculum.json'
+
+# Subject whose documents may still live directly in data/pyqs and data/textbooks
+LEGACY_SUBJECT = 'biology'
+
+
+def discover_subjects(data_dir):
+    """
+    Returns {subject name: curriculum path} for every `<subject>_curriculum.json` in `data_dir`.
+    """
+    subjects = {}
+    for path in sorted(glob.glob(os.path.join(data_dir, f"*{CURRICULUM_SUFFIX}"))):
+        name = os.path.basename(path)[:-len(CURRICULUM_SUFFIX)].lower()
+        subjects[name] = path
+    return subjects
+
+
+def subject_key(name):
+    """
+    Returns the registry key of a subject given as its key or display name ('Social Studies' -> 'social_studies').
+    """
+    return '_'.join(name.strip().lower().split())
+
+
+def list_document_files(directory, verbose=True):
+    """
+    Returns the sorted paths of all files directly inside `directory`.
+    """
+    if not os.path.isdir(directory):
+        if verbose:
+            print(f"  - Directory not found, skipping: {directory}")
+        return []
+    paths = [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))]
+    return [path for path in paths if os.path.isfile(path)] # Ensure it's a file, not a directory
+
+
+def document_dirs(data_dir, name):
+    """
+    Returns the (pyqs, textbooks) directories of a subject: `data/<subject>/pyqs|textbooks`,
+    or `data/pyqs|textbooks` for the legacy single-subject layout.
+    """
+    subject_dir = os.path.join(data_dir, name)
+    if name == LEGACY_SUBJECT and not os.path.isdir(subject_dir):
+        subject_dir = data_dir
+    return os.path.join(subject_dir, 'pyqs'), os.path.join(subject_dir, 'textbooks')
+
+
+def load_curriculum(curriculum_path, name):
+    """
+    Reads a curriculum file and returns its {chapter: [subtopics]} section for `name`
+    (a file with a single top-level section may use any key). Returns {} if it cannot be read.
+    """
+    try:
+        with open(curriculum_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"Successfully loaded {name} curriculum from: {curriculum_path}")
+    except FileNotFoundError:
+        print(f"Error: {curriculum_path} not found. Please ensure it's in the 'backend/data/' directory.")
+        return {}
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {curriculum_path}. Check file format.")
+        return {}
+    if name in data:
+        return data[name]
+    if len(data) == 1:
+        return next(iter(data.values()))
+    print(f"Error: {curriculum_path} has no '{name}' section.")
+    return {}
+
+
+class Subject:
+    """
+    Everything needed to serve one subject: its curriculum (flattened topics and a
+    topic -> chapter index), offline scorers and its document corpus.
+
+    `load_corpus_fn(subject, progress)` reads the subject's documents; it runs on the
+    subject's own CorpusLoader, so subjects load independently of each other.
+    If `snapshot_root` holds a topic-weight snapshot for the subject's current curriculum,
+    requests with the snapshot's scoring mode are served from it without the documents.
+    `snapshot_expected` is passed to load_snapshot() to warn about snapshots built with another
+    model or prompt.
+    """
+
+    def __init__(self, name, curriculum_path, data_dir, load_corpus_fn, tfidf_root, store_root, snapshot_root=None, snapshot_expected=None):
+        self.name = name
+        self.display_name = name.replace('_', ' ').title()
+        self.curriculum = load_curriculum(curriculum_path, name)
+        # Flatten all subtopics into a single list for easier keyword matching/Grok AI prompting
+        self.topics = [subtopic for chapter_topics in self.curriculum.values() for subtopic in chapter_topics]
+        self.topic_chapters = {subtopic: chapter for chapter, chapter_topics in self.curriculum.items() for subtopic in chapter_topics}
+        print(f"Total {len(self.topics)} {name} subtopics loaded for analysis.")
+        # Version of the curriculum, part of every cache key derived from it
+        self.version = fingerprint(self.topics)
+        self.pyqs_dir, self.textbooks_dir = document_dirs(data_dir, name)
+        self.store_dir = os.path.join(store_root, name)
+        self.keyword_scorer = KeywordScorer(self.curriculum)
+        self.tfidf_index = TfidfTopicIndex(self.keyword_scorer, os.path.join(tfidf_root, name))
+        self.corpus_loader = CorpusLoader(lambda progress: load_corpus_fn(self, progress))
+        self.snapshot = None
+        if snapshot_root:
+            self.snapshot = load_snapshot(snapshot_path(snapshot_root, name), self.topics, self.version, snapshot_expected)
+
+    def snapshot_for(self, scoring_mode):
+        """
+        Returns the subject's topic-weight snapshot if it was built with `scoring_mode`, else None.
+        """
+        if self.snapshot is not None and self.snapshot.scoring_mode == scoring_mode:
+            return self.snapshot
+        return None
+
+    def document_files(self, verbose=True):
+        """
+        Returns the (PYQ files, textbook files) currently in the subject's document directories.
+        """
+        return list_document_files(self.pyqs_dir, verbose), list_document_files(self.textbooks_dir, verbose)
+
+    def pending_changes(self):
+        """
+        Compares the document directories with the manifest of the loaded corpus store.
+        Only files whose size or mtime changed are re-hashed; if their content turns out to be
+        unchanged, the new sizes and mtimes are recorded so they are not hashed again.
+        Returns (added, changed, removed) file paths, or None if no corpus store is loaded yet.
+        """
+        store = self.corpus_loader.documents
+        if not isinstance(store, CorpusStore):
+            return None
+        pyq_files, textbook_files = self.document_files(verbose=False)
+        files = file_manifest(pyq_files + textbook_files, store.files)
+        changes = diff_manifest(store.files, files)
+        if not any(changes) and files != store.files:
+            store.update_files(files)
+        return changes
+
+    def memory_bytes(self):
+        """
+        Rough size of what this subject keeps loaded: the TF-IDF matrices and the mapped corpus.
+        """
+        index = self.tfidf_index
+        total = sum(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+                    for matrix in (index.counts, index.keyword_topic_matrix))
+        total += sum(len(topic) for topic in self.topics)
+        documents = self.corpus_loader.documents
+        return total + (documents.nbytes() if hasattr(documents, 'nbytes') else sum(len(text) for text in documents.values()))
+
+    def summary(self):
+        return {
+            'subject': self.name,
+            'name': self.display_name,
+            'chapters': len(self.curriculum),
+            'topics': len(self.topics),
+            'corpus': self.corpus_loader.status(),
+            'snapshot': self.snapshot.summary() if self.snapshot else None,
+        }
+
+
+class SubjectRegistry:
+    """
+    Discovers subjects from `data/<subject>_curriculum.json` files and loads them on first use.
+    A subject's corpus starts loading right away unless it has a topic-weight snapshot; then it
+    is only loaded once a request needs it (see Subject).
+
+    At most `max_loaded` subjects (and, if set, roughly `max_bytes` of their data) stay loaded;
+    the least recently used ones are dropped beyond that and simply reload on their next request.
+    Requests already holding an evicted Subject keep using it until they finish.
+    """
+
+    def __init__(self, data_dir, load_corpus_fn, tfidf_root, store_root, max_loaded=4, max_bytes=None, snapshot_root=None,
+                 snapshot_expected_fn=None):
+        self.data_dir = data_dir
+        self.load_corpus_fn = load_corpus_fn
+        self.tfidf_root = tfidf_root
+        self.store_root = store_root
+        self.snapshot_root = snapshot_root
+        self.snapshot_expected_fn = snapshot_expected_fn # Returns load_snapshot()'s `expected` when a subject loads
+        self.max_loaded = max_loaded
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict() # name -> Subject, least recently used first
+        self._available = discover_subjects(data_dir)
+
+    def names(self):
+        """
+        Returns the names of all available subjects, picking up curricula added since startup.
+        """
+        self._available = discover_subjects(self.data_dir)
+        return list(self._available)
+
+    def __contains__(self, name):
+        return name in self._available or name in self.names()
+
+    def get(self, name):
+        """
+        Returns the Subject `name`, loading it (and, without a snapshot, starting its corpus load) if needed.
+        Raises KeyError for unknown subjects.
+        """
+        with self._lock:
+            subject = self._loaded.get(name)
+            if subject is not None:
+                self._loaded.move_to_end(name)
+        if subject is None:
+            if name not in self:
+                raise KeyError(name)
+            with self._lock:
+                subject = self._loaded.get(name)
+                if subject is None:
+                    subject = Subject(name, self._available[name], self.data_dir, self.load_corpus_fn, self.tfidf_root, self.store_root,
+                                      self.snapshot_root, self.snapshot_expected_fn() if self.snapshot_expected_fn else None)
+                    self._loaded[name] = subject
+                self._loaded.move_to_end(name)
+                self._evict()
+        if subject.snapshot is None:
+            subject.corpus_loader.ensure_started()
+        return subject
+
+    def loaded(self):
+        with self._lock:
+            return list(self._loaded.values())
+
+    def _evict(self):
+        """
+        Drops least recently used subjects beyond the configured limits. Called with the lock held.
+        Subjects whose corpus is still loading are kept.
+        """
+        def over_limit():
+            if len(self._loaded) > self.max_loaded:
+                return True
+            return bool(self.max_bytes) and sum(subject.memory_bytes() for subject in self._loaded.values()) > self.max_bytes
+
+        for name in list(self._loaded)[:-1]: # Never evict the subject just requested
+            if not over_limit():
+                break
+            if self._loaded[name].corpus_loader.is_loading:
+                continue
+            del self._loaded[name]
+            print(f"Unloaded subject '{name}' to stay within the subject cache limits.")
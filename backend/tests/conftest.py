@@ -0,0 +1,7 @@
+# scheduler/backend/tests/conftest.py
+
+import os
+import sys
+
+# Backend modules import each other as top-level modules (e.g. `from scheduler import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
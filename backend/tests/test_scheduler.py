@@ -0,0 +1,93 @@
+# scheduler/backend/tests/test_scheduler.py
+
+import json
+import os
+import random
+
+import pytest
+
+from scheduler import MIN_SESSION_MINUTES, REVIEW_LABEL, build_schedule
+
+CURRICULUM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'biology_curriculum.json')
+
+
+def curriculum_topics():
+    with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
+        curriculum = json.load(f)['biology']
+    return [subtopic for chapter_topics in curriculum.values() for subtopic in chapter_topics]
+
+
+def weighted(topics):
+    return [(topic, 1 + i % 5) for i, topic in enumerate(topics)]
+
+
+def study_entries(day_plan):
+    return [entry for entry in day_plan['topics'] if not entry.endswith('(Revision)') and not entry.startswith(REVIEW_LABEL)]
+
+
+@pytest.mark.parametrize('days', [8, 10, 30])
+def test_every_curriculum_topic_is_placed_when_it_fits(days):
+    # 93 topics at 15 minutes need 7.75 days of 180 study minutes (75% of 240)
+    topics = curriculum_topics()
+    unplaced = []
+    schedule = build_schedule(weighted(topics), days, 85, minutes_per_day=240, unplaced=unplaced)
+    placed = {entry for day_plan in schedule for entry in study_entries(day_plan)}
+    assert unplaced == []
+    assert placed == set(topics)
+
+
+def test_leftovers_are_the_lowest_weight_topics_and_returned():
+    topics = curriculum_topics()
+    unplaced = []
+    schedule = build_schedule(weighted(topics), 7, 85, minutes_per_day=240, unplaced=unplaced)
+    placed = [entry for day_plan in schedule for entry in study_entries(day_plan)]
+    study_slots = 7 * (240 * 3 // 4) // MIN_SESSION_MINUTES
+    assert len(placed) == study_slots
+    assert len(placed) + len(unplaced) == len(topics)
+    weights = dict(weighted(topics))
+    assert max(weights[topic] for topic in unplaced) <= min(weights[topic] for topic in placed)
+
+
+def test_days_stay_within_the_daily_budget():
+    # Equal weights give every topic 60 study minutes; at most 3 fit in the 180-minute study share
+    topics = [f"Topic {i:02d}" for i in range(20)]
+    schedule = build_schedule([(topic, 1) for topic in topics], 30, 95, minutes_per_day=240)
+    assert len(schedule) == 30
+    for day_plan in schedule:
+        assert len(study_entries(day_plan)) <= 3
+        # Revisions of 60-minute topics take 20 minutes; the whole day never exceeds 240
+        revisions = [entry for entry in day_plan['topics'] if entry.endswith('(Revision)')]
+        assert 60 * len(study_entries(day_plan)) + 20 * len(revisions) <= 240
+
+
+def test_floor_sessions_fill_each_day_exactly_to_its_budget():
+    topics = [f"Topic {i:03d}" for i in range(100)]
+    schedule = build_schedule([(topic, 1) for topic in topics], 4, 50, minutes_per_day=120)
+    for day_plan in schedule:
+        assert len(day_plan['topics']) <= 120 // MIN_SESSION_MINUTES
+
+
+def test_revisions_come_after_the_study_session():
+    topics = [f"Topic {i}" for i in range(6)]
+    schedule = build_schedule([(topic, 6 - i) for i, topic in enumerate(topics)], 20, 90)
+    study_day = {entry: day_plan['day'] for day_plan in schedule for entry in study_entries(day_plan)}
+    for day_plan in schedule:
+        for entry in day_plan['topics']:
+            if entry.endswith(' (Revision)'):
+                assert day_plan['day'] > study_day[entry[:-len(' (Revision)')]]
+
+
+def test_schedule_is_deterministic_regardless_of_input_order():
+    topics = weighted(curriculum_topics())
+    shuffled = list(topics)
+    random.Random(7).shuffle(shuffled)
+    assert build_schedule(topics, 20, 80) == build_schedule(shuffled, 20, 80)
+
+
+def test_equal_weights_are_ordered_by_name():
+    schedule = build_schedule([('Beta', 1), ('Alpha', 1), ('Gamma', 1)], 1, 50, minutes_per_day=240)
+    assert study_entries(schedule[0]) == ['Alpha', 'Beta', 'Gamma']
+
+
+def test_no_weighted_topics_gives_review_days():
+    assert build_schedule([('Unused', 0)], 2, 70) == [{'day': 1, 'topics': [REVIEW_LABEL]}, {'day': 2, 'topics': [REVIEW_LABEL]}]
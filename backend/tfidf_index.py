@@ -0,0 +1,170 @@
+# scheduler/backend/tfidf_index.py
+
+import copy
+import io
+import json
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from corpus_store import document_hash
+from topic_cache import fingerprint
+from utils import atomic_write
+
+
+class TfidfTopicIndex:
+    """
+    Sparse keyword index over the document corpus, used to weight curriculum topics with TF-IDF.
+
+    The vocabulary is the set of curriculum keywords from a KeywordScorer. Each document is
+    stored as one row of raw keyword counts (documents x keywords), so adding or changing a
+    paper only requires counting that paper; IDF is recomputed from the stored counts.
+    Topic weights are then a single sparse product: tfidf (documents x keywords) times the
+    keyword-to-topic incidence matrix (keywords x topics), summed over documents.
+
+    The counts are persisted to `index_dir` and reloaded on startup. An index is not modified
+    once in use: updated() returns a new one for a changed corpus.
+    """
+
+    def __init__(self, keyword_scorer, index_dir):
+        self.scorer = keyword_scorer
+        self.index_dir = index_dir
+        self.counts_path = os.path.join(index_dir, 'counts.npz')
+        self.meta_path = os.path.join(index_dir, 'meta.json')
+        self.topics = list(keyword_scorer.topics)
+        self.keywords = sorted(keyword_scorer.keyword_topics)
+        self.keyword_ids = {keyword: i for i, keyword in enumerate(self.keywords)}
+        self.version = fingerprint(self.keywords, self.topics)
+
+        topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+        rows, cols = [], []
+        for keyword, topics in keyword_scorer.keyword_topics.items():
+            for topic in topics:
+                rows.append(self.keyword_ids[keyword])
+                cols.append(topic_ids[topic])
+        self.keyword_topic_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(len(self.keywords), len(self.topics))
+        )
+
+        self._lock = threading.Lock()
+        self.doc_ids = [] # (file path, content hash) per row of self.counts
+        self.counts = sparse.csr_matrix((0, len(self.keywords)), dtype=np.float64)
+        self._topic_weights = None
+        self.load()
+
+    def _count_row(self, text):
+        """
+        Returns the keyword counts of `text` as a 1 x keywords sparse row.
+        """
+        counts = self.scorer.count_keywords(text)
+        cols = [self.keyword_ids[keyword] for keyword in counts]
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return sparse.csr_matrix((values, ([0] * len(cols), cols)), shape=(1, len(self.keywords)))
+
+    def _doc_ids(self, document_contents):
+        return [(doc_path, document_hash(document_contents, doc_path)) for doc_path in document_contents]
+
+    def _with_documents(self, document_contents):
+        """
+        Returns (index, added, removed): a copy of this index matching `document_contents`
+        ({filepath: content} mapping), or this index itself if it already matches.
+        Only new or changed documents are counted (or read, for a CorpusStore); removed documents are dropped.
+        This index is left untouched, so requests holding it keep seeing consistent weights.
+        """
+        with self._lock:
+            doc_ids = self._doc_ids(document_contents)
+            if doc_ids == self.doc_ids:
+                return self, 0, 0
+            existing = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+            rows, added = [], 0
+            for doc_path, doc_id in zip(document_contents, doc_ids):
+                if doc_id in existing:
+                    rows.append(self.counts[existing[doc_id]])
+                else:
+                    rows.append(self._count_row(document_contents[doc_path]))
+                    added += 1
+            removed = len(set(existing) - set(doc_ids))
+
+        index = copy.copy(self)
+        index._lock = threading.Lock()
+        index.counts = sparse.vstack(rows, format='csr') if rows else sparse.csr_matrix((0, len(self.keywords)))
+        index.doc_ids = doc_ids
+        index._topic_weights = None
+        return index, added, removed
+
+    def updated(self, document_contents):
+        """
+        Returns an index matching `document_contents`, saved to disk: a new TfidfTopicIndex if
+        any document was added, changed or removed, else this one. The caller swaps it in,
+        so readers of the current index never see a half-updated one.
+        """
+        index, added, removed = self._with_documents(document_contents)
+        if index is not self:
+            with index._lock:
+                index.save()
+            print(f"TF-IDF index updated: {added} added or changed, {removed} removed, {len(index.doc_ids)} documents indexed.")
+        return index
+
+    def topic_weights(self, document_contents=None):
+        """
+        Returns a Counter of {topic: TF-IDF weight} summed over all indexed documents.
+        If `document_contents` is given, the weights are those of exactly these documents; if
+        they differ from the indexed ones (e.g. a request still holding the previous corpus
+        while a reload swaps in a new index), they are computed on a temporary copy and
+        neither cached nor saved.
+        """
+        if document_contents is not None:
+            index, _, _ = self._with_documents(document_contents)
+            if index is not self:
+                return Counter(index._compute_topic_weights())
+        with self._lock:
+            if self._topic_weights is None:
+                self._topic_weights = self._compute_topic_weights()
+            return Counter(self._topic_weights)
+
+    def _compute_topic_weights(self):
+        if self.counts.shape[0] == 0 or self.counts.nnz == 0:
+            return Counter()
+        # Rows are L2-normalised, so every document contributes on the same scale
+        tfidf = TfidfTransformer(sublinear_tf=True).fit_transform(self.counts)
+        weights = np.asarray((tfidf @ self.keyword_topic_matrix).sum(axis=0)).ravel()
+        return Counter({topic: round(float(weight), 4) for topic, weight in zip(self.topics, weights) if weight > 0})
+
+    def save(self):
+        """
+        Persists the keyword counts and document ids. Called with the lock held.
+        """
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            buffer = io.BytesIO()
+            sparse.save_npz(buffer, self.counts)
+            atomic_write(self.counts_path, buffer.getvalue(), mode='wb')
+            atomic_write(self.meta_path, json.dumps({'version': self.version, 'documents': self.doc_ids}))
+        except OSError as e:
+            print(f"Warning: Could not save TF-IDF index to {self.index_dir}: {e}")
+
+    def load(self):
+        """
+        Loads a previously saved index, unless it was built for a different curriculum vocabulary.
+        """
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != self.version:
+                print("TF-IDF index was built for a different curriculum, it will be rebuilt.")
+                return
+            counts = sparse.load_npz(self.counts_path).tocsr()
+            doc_ids = [tuple(doc_id) for doc_id in meta['documents']]
+            if counts.shape != (len(doc_ids), len(self.keywords)):
+                print("TF-IDF index files are inconsistent, it will be rebuilt.")
+                return
+            self.counts, self.doc_ids = counts, doc_ids
+            print(f"Loaded TF-IDF index with {len(doc_ids)} documents from {self.index_dir}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Could not load TF-IDF index from {self.index_dir}: {e}")
@@ -0,0 +1,118 @@
+# scheduler/backend/topic_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils import sqlite_connection
+
+
+def content_hash(text):
+    """
+    Returns the SHA-256 hex digest of a document's text.
+    Not memoized: that would keep every hashed text alive. Whole documents are hashed once
+    at ingest time and read back from the corpus store index (see corpus_store.document_hash).
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def fingerprint(*parts):
+    """
+    Returns a short stable hash of JSON-serialisable values (curriculum topics, prompt templates...).
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class TopicScoreCache:
+    """
+    Persistent SQLite cache of per-document LLM topic scores.
+
+    Each entry is keyed by the document content hash, the curriculum version, the prompt
+    template version and the model name, so any of those changing naturally misses the cache.
+    Entries are evicted least-recently-used once `max_entries` is exceeded, and expire after
+    `ttl_seconds` (if set).
+    """
+
+    def __init__(self, db_path, max_entries=10000, ttl_seconds=None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS topic_scores (
+                    doc_hash TEXT NOT NULL,
+                    curriculum_version TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    scores TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (doc_hash, curriculum_version, prompt_version, model)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_topic_scores_last_used ON topic_scores (last_used)")
+
+    def _connect(self):
+        return sqlite_connection(self.db_path)
+
+    def get(self, doc_hash, curriculum_version, prompt_version, model):
+        """
+        Returns the cached list of (topic, score) pairs, or None on a miss.
+        """
+        key = (doc_hash, curriculum_version, prompt_version, model)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT scores, created_at FROM topic_scores WHERE doc_hash = ? AND curriculum_version = ? AND prompt_version = ? AND model = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    return None
+                scores, created_at = row
+                if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                    conn.execute(
+                        "DELETE FROM topic_scores WHERE doc_hash = ? AND curriculum_version = ? AND prompt_version = ? AND model = ?",
+                        key,
+                    )
+                    return None
+                conn.execute(
+                    "UPDATE topic_scores SET last_used = ? WHERE doc_hash = ? AND curriculum_version = ? AND prompt_version = ? AND model = ?",
+                    (now, *key),
+                )
+            return [tuple(pair) for pair in json.loads(scores)]
+        except sqlite3.Error as e:
+            print(f"Warning: Topic score cache lookup failed: {e}")
+            return None
+
+    def put(self, doc_hash, curriculum_version, prompt_version, model, scores):
+        """
+        Stores a list of (topic, score) pairs and evicts the least recently used entries
+        beyond `max_entries`.
+        """
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO topic_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_hash, curriculum_version, prompt_version, model, json.dumps(scores), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM topic_scores WHERE rowid IN (SELECT rowid FROM topic_scores ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            print(f"Warning: Could not store topic scores in cache: {e}")
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM topic_scores")
@@ -1,8 +1,11 @@
 # scheduler/backend/utils.py
 
+import contextlib
 import os
 import PyPDF2
 import re # Add this line
+import sqlite3
+import threading
 # import nltk # Uncomment if you install NLTK
 # from nltk.corpus import stopwords # Uncomment if you install NLTK
 # from nltk.tokenize import word_tokenize, sent_tokenize # Uncomment if you install NLTK
@@ -16,27 +19,65 @@ import re # Add this line
 #     nltk.download('stopwords')
 
 
-def extract_text_from_pdf(pdf_path):
+def iter_pdf_pages(pdf_path, start=0, stop=None):
     """
-    Extracts text content from a PDF file.
+    Yields the text of each page of a PDF file, one page at a time.
     Args:
         pdf_path (str): The full path to the PDF file.
-    Returns:
-        str: The extracted text, or an empty string if an error occurs.
+        start (int): Index of the first page to read.
+        stop (int): Index one past the last page to read (defaults to the end of the document).
+    Yields:
+        str: The extracted text of each page ('' for pages without a text layer).
+    """
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        num_pages = len(reader.pages)
+        stop = num_pages if stop is None else min(stop, num_pages)
+        for page_num in range(start, stop):
+            yield reader.pages[page_num].extract_text() or ''
+
+def count_pdf_pages(pdf_path):
+    """
+    Returns the number of pages in a PDF file, or 0 if it cannot be read.
     """
-    text = ""
     try:
         with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page_num in range(len(reader.pages)):
-                text += reader.pages[page_num].extract_text() or ''
-        return text
+            return len(PyPDF2.PdfReader(file).pages)
+    except Exception as e:
+        print(f"Error counting pages in {pdf_path}: {e}")
+        return 0
+
+def extract_pages_from_pdf(pdf_path, start=0, stop=None):
+    """
+    Extracts the text of each page of a PDF file.
+    Args:
+        pdf_path (str): The full path to the PDF file.
+        start (int): Index of the first page to read.
+        stop (int): Index one past the last page to read (defaults to the end of the document).
+    Returns:
+        list: The text of each page, or an empty list if an error occurs.
+    """
+    try:
+        return list(iter_pdf_pages(pdf_path, start, stop))
     except PyPDF2.errors.PdfReadError:
         print(f"Warning: Could not read PDF file {pdf_path}. It might be corrupted or encrypted.")
-        return ""
+        return []
     except Exception as e:
         print(f"Error extracting text from {pdf_path}: {e}")
-        return ""
+        return []
+
+def extract_text_from_pdf(pdf_path, start=0, stop=None):
+    """
+    Extracts text content from a PDF file.
+    Args:
+        pdf_path (str): The full path to the PDF file.
+        start (int): Index of the first page to read.
+        stop (int): Index one past the last page to read (defaults to the end of the document).
+    Returns:
+        str: The extracted text, or an empty string if an error occurs.
+    """
+    # Join once at the end instead of growing a string page by page
+    return ''.join(extract_pages_from_pdf(pdf_path, start, stop))
 
 def preprocess_text(text):
     """
@@ -73,3 +114,39 @@ def read_text_file(file_path):
     except Exception as e:
         print(f"Error reading text file {file_path}: {e}")
         return ""
+
+def atomic_write(path, data, mode='w'):
+    """
+    Writes `data` to a temporary file next to `path` and renames it into place,
+    so readers (or other gunicorn workers) never see a half-written file.
+    Args:
+        path (str): The destination file path.
+        data (str or bytes): The content to write.
+        mode (str): 'w' for text (UTF-8) or 'wb' for bytes.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    encoding = 'utf-8' if 'b' not in mode else None
+    with open(tmp_path, mode, encoding=encoding) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def sqlite_connection(db_path, row_factory=None, timeout=30):
+    """
+    Opens a short-lived SQLite connection for one operation. Commits on success, rolls back
+    on error and always closes it; one connection per call keeps the SQLite-backed caches and
+    the job queue safe across threads and gunicorn workers.
+    Args:
+        db_path (str): The database file path.
+        row_factory: Optional sqlite3 row factory (e.g. sqlite3.Row).
+        timeout (float): Seconds to wait for a lock held by another connection.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    try:
+        with conn: # Commits on success, rolls back on error
+            yield conn
+    finally:
+        conn.close()
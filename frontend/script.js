@@ -107,7 +107,7 @@ document.addEventListener('DOMContentLoaded', () => {
      * Resets the form inputs and returns the UI to its initial state.
      */
     function resetForm() {
-        subjectSelect.value = 'Biology'; // Reset subject to default
+        subjectSelect.value = 'biology'; // Reset subject to default
         preparationDaysInput.value = ''; // Clear days input
         targetScoreInput.value = '';     // Clear score input
         hideErrorMessage();              // Hide errors
@@ -143,9 +143,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             // --- BACKEND INTEGRATION POINT ---
-            // This is where you make the actual API call to your Grok AI powered backend.
+            // The streaming endpoint reports progress (Server-Sent Events) while documents are analyzed,
+            // so the user sees what is happening instead of a silent spinner.
             // Replace the URL with your backend's actual endpoint.
-            const response = await fetch('http://localhost:5000/api/generate-schedule', {
+            const response = await fetch('http://localhost:5000/api/generate-schedule/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -165,8 +166,8 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error(errorData.message || 'Failed to generate schedule from backend.');
             }
 
-            const data = await response.json(); // Parse the JSON response from the backend
-            displaySchedule(data.schedule); // Call function to display the received schedule
+            const schedule = await readScheduleStream(response); // Collect the streamed schedule days
+            displaySchedule(schedule); // Call function to display the received schedule
 
         } catch (err) {
             // Catch and handle any errors during the fetch operation or response parsing
@@ -176,6 +177,85 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    /**
+     * Reads a Server-Sent Events response from the streaming schedule endpoint.
+     * Updates the loading message as documents are analyzed and collects the schedule days.
+     * @param {Response} response - The fetch response with a text/event-stream body.
+     * @returns {Promise<Array<Object>>} The schedule, an array of objects with 'day' and 'topics'.
+     */
+    async function readScheduleStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const schedule = [];
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            // Events are separated by a blank line
+            let separatorIndex;
+            while ((separatorIndex = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, separatorIndex);
+                buffer = buffer.slice(separatorIndex + 2);
+
+                let eventName = 'message';
+                let data = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) {
+                        eventName = line.slice(7);
+                    } else if (line.startsWith('data: ')) {
+                        data += line.slice(6);
+                    }
+                });
+                if (!data) {
+                    continue; // Keep-alive comment
+                }
+                const payload = JSON.parse(data);
+
+                if (eventName === 'document') {
+                    document.getElementById('loadingMessage').textContent =
+                        `Analyzed ${payload.documentsDone} of ${payload.documentsTotal} documents...`;
+                } else if (eventName === 'weights') {
+                    document.getElementById('loadingMessage').textContent = 'Building your schedule...';
+                } else if (eventName === 'day') {
+                    schedule.push(payload);
+                } else if (eventName === 'error') {
+                    throw new Error(payload.message || 'Failed to generate schedule from backend.');
+                }
+            }
+        }
+        return schedule;
+    }
+
+    /**
+     * Fills the subject dropdown with the subjects the backend has curricula for.
+     * Keeps the default "Biology" option if the backend cannot be reached.
+     */
+    async function loadSubjects() {
+        try {
+            const response = await fetch('http://localhost:5000/api/subjects');
+            if (!response.ok) {
+                return;
+            }
+            const { subjects } = await response.json();
+            if (!subjects || subjects.length === 0) {
+                return;
+            }
+            subjectSelect.innerHTML = subjects
+                .map(subject => `<option value="${subject.subject}">${subject.name}</option>`)
+                .join('');
+            subjectSelect.value = subjects.some(subject => subject.subject === 'biology') ? 'biology' : subjects[0].subject;
+        } catch (error) {
+            console.error('Could not load subjects:', error);
+        }
+    }
+
     // Event listener for the "Reset" button click
     resetBtn.addEventListener('click', resetForm);
+
+    loadSubjects();
 });